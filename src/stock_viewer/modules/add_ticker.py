@@ -0,0 +1,217 @@
+import os
+import json
+import bisect
+
+from PyQt5.QtWidgets import (
+    QDialog, QFormLayout, QLineEdit, QDoubleSpinBox, QComboBox,
+    QDialogButtonBox, QCompleter
+)
+from PyQt5.QtCore import Qt, QStringListModel
+
+
+class SymbolIndex:
+    """
+    Índice de prefixos para autocompletar símbolos.
+
+    Cada símbolo entra com várias chaves (código, código sem sufixo, nome e
+    cada palavra do nome) numa lista ordenada; search() acha o início do
+    prefixo com bisect e percorre só as chaves que casam: O(log n + k).
+
+    O índice pode ficar vivo entre usos: add() de um símbolo já conhecido
+    não custa nada, e as chaves que chegam depois da primeira ordenação vão
+    para uma segunda lista pequena (recent), sem reordenar a principal.
+    """
+
+    def __init__(self):
+        self.names = {}      # símbolo -> nome
+        self.entries = []    # (chave em maiúsculas, símbolo), ordenadas
+        self.recent = []     # idem, adicionadas depois do primeiro build()
+        self._pending = []
+
+    def add(self, symbol, name=""):
+        symbol = symbol.strip().upper()
+        if not symbol:
+            return
+
+        name = (name or "").strip()
+        if symbol in self.names and (not name or self.names[symbol] == name):
+            return
+
+        self.names[symbol] = name
+
+        keys = {symbol, symbol.split(".")[0]}
+        if name:
+            keys.add(name.upper())
+            keys.update(word for word in name.upper().split() if len(word) > 1)
+
+        self._pending.extend((key, symbol) for key in keys)
+
+    def build(self):
+        """Ordena as chaves novas; chamado antes de cada busca."""
+        if not self._pending:
+            return
+
+        pending = sorted(set(self._pending))
+        self._pending = []
+
+        if not self.entries:
+            self.entries = pending
+            return
+
+        for entry in pending:
+            if not _contains(self.entries, entry) and not _contains(self.recent, entry):
+                bisect.insort(self.recent, entry)
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, prefix, limit=50):
+        """Símbolos cujo código ou nome começa com prefix; códigos exatos primeiro."""
+        self.build()
+
+        prefix = prefix.strip().upper()
+        if not prefix:
+            return []
+
+        found = []
+        seen = set()
+
+        # até limit de cada lista, para a recent não ficar de fora
+        for entries in (self.entries, self.recent):
+            n = len(found) + limit
+            k = bisect.bisect_left(entries, (prefix,))
+            while k < len(entries) and entries[k][0].startswith(prefix) and len(found) < n:
+                symbol = entries[k][1]
+                if symbol not in seen:
+                    seen.add(symbol)
+                    found.append(symbol)
+                k += 1
+
+        found.sort(key=lambda symbol: (not symbol.startswith(prefix), len(symbol), symbol))
+        return found[:limit]
+
+    def label(self, symbol):
+        name = self.names.get(symbol, "")
+        return f"{symbol} - {name}" if name else symbol
+
+
+def _contains(entries, entry):
+    k = bisect.bisect_left(entries, entry)
+    return k < len(entries) and entries[k] == entry
+
+
+def _b3_ticker_files(cache_dir):
+    if not os.path.isdir(cache_dir):
+        return []
+
+    paths = []
+    for entry in sorted(os.listdir(cache_dir)):
+        path = os.path.join(cache_dir, entry, "tickers.json")
+        if entry.startswith("COTAHIST_") and os.path.exists(path):
+            paths.append(path)
+    return paths
+
+
+def b3_symbols_version(cache_dir):
+    """Muda quando algum tickers.json do cache COTAHIST é criado ou regravado."""
+    version = []
+    for path in _b3_ticker_files(cache_dir):
+        try:
+            version.append((path, os.path.getmtime(path)))
+        except OSError:
+            continue
+    return tuple(version)
+
+
+def b3_symbols(cache_dir, suffix=".SA"):
+    """(símbolo, NOMRES) de todos os anos COTAHIST já em cache (sem download)."""
+    symbols = {}
+
+    for path in _b3_ticker_files(cache_dir):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        for code, name in zip(data["codes"], data["names"]):
+            symbols[code.strip() + suffix] = name
+
+    return list(symbols.items())
+
+
+class AddTickerDialog(QDialog):
+    """Escolhe um ticker (com autocompletar), quantidade, preço médio e grupo."""
+
+    def __init__(self, index, groups, group="", config=None, parent=None):
+        super().__init__(parent)
+        config = config or {}
+
+        self.index = index
+
+        self.setWindowTitle(config.get("add_ticker_title", "Add ticker"))
+        self.setMinimumWidth(400)
+
+        layout = QFormLayout(self)
+
+        self.symbol_edit = QLineEdit(self)
+        self.symbol_edit.setPlaceholderText(config.get("add_ticker_symbol_tooltip", ""))
+        self.symbol_edit.setToolTip(config.get("add_ticker_symbol_tooltip", ""))
+        layout.addRow(config.get("add_ticker_symbol", "Ticker:"), self.symbol_edit)
+
+        # a filtragem é do SymbolIndex; o completer só mostra o resultado
+        self.completion_model = QStringListModel(self)
+        self.completer = QCompleter(self.completion_model, self)
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.symbol_edit.setCompleter(self.completer)
+        self.completer.activated[str].connect(self.on_completion_activated)
+        self.symbol_edit.textEdited.connect(self.update_completions)
+
+        self.quantity_spin = QDoubleSpinBox(self)
+        self.quantity_spin.setDecimals(0)
+        self.quantity_spin.setMaximum(1e9)
+        layout.addRow(config.get("add_ticker_quantity", "Quantity:"), self.quantity_spin)
+
+        self.price_spin = QDoubleSpinBox(self)
+        self.price_spin.setDecimals(2)
+        self.price_spin.setMaximum(1e9)
+        layout.addRow(config.get("add_ticker_average_price", "Average price:"), self.price_spin)
+
+        self.group_combo = QComboBox(self)
+        self.group_combo.setEditable(True)
+        self.group_combo.addItems(sorted(groups))
+        self.group_combo.setCurrentText(group)
+        layout.addRow(config.get("add_ticker_group", "Group:"), self.group_combo)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Cancel, self)
+        self.add_button = buttons.addButton(config.get("add_ticker_button", "Add"), QDialogButtonBox.AcceptRole)
+        self.add_button.setEnabled(False)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+        self.symbol_edit.textChanged.connect(
+            lambda text: self.add_button.setEnabled(bool(self.symbol()))
+        )
+
+    def update_completions(self, text):
+        self.completion_model.setStringList(
+            [self.index.label(symbol) for symbol in self.index.search(text)]
+        )
+
+    def on_completion_activated(self, label):
+        # "PETR4.SA - PETROBRAS" -> "PETR4.SA"
+        self.symbol_edit.setText(label.split(" - ")[0])
+
+    def symbol(self):
+        return self.symbol_edit.text().split(" - ")[0].strip().upper()
+
+    def values(self):
+        """(ticker, quantity, average_price, group)"""
+        return (
+            self.symbol(),
+            int(self.quantity_spin.value()),
+            float(self.price_spin.value()),
+            self.group_combo.currentText().strip()
+        )
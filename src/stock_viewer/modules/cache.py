@@ -0,0 +1,135 @@
+import os
+import time
+import pickle
+import hashlib
+import threading
+
+CACHE_ROOT = os.path.join(os.path.expanduser("~"), ".cache", "stock_viewer")
+
+DEFAULT_CACHE_DIR = os.path.join(CACHE_ROOT, "data")
+
+# validade de cada classe de dado, em segundos
+DEFAULT_TTL = {
+    "quote":      60,
+    "info":       24 * 3600,
+    "dividends":  24 * 3600,
+    "statements": 90 * 24 * 3600,
+}
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+_MISSING = object()
+
+
+class DiskCache:
+    """
+    Cache em disco com TTL por classe de dado (quote, info, dividends, statements).
+
+    Cada entrada é um pickle (saved_at, value) em cache_dir/<kind>/<sha1>.pkl.
+    O mtime do arquivo marca o último acesso; quando o total passa de max_bytes
+    as entradas menos usadas recentemente são removidas.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = dict(DEFAULT_TTL)
+        self.ttl.update(ttl or {})
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.size = sum(os.path.getsize(path) for path, _ in self._entries())
+
+    def _path(self, kind, key):
+        name = hashlib.sha1(str(key).encode("utf-8")).hexdigest() + ".pkl"
+        return os.path.join(self.cache_dir, kind, name)
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".pkl"):
+                    path = os.path.join(root, name)
+                    try:
+                        yield path, os.path.getmtime(path)
+                    except OSError:
+                        continue
+
+    def get(self, kind, key, default=None):
+        path = self._path(kind, key)
+
+        try:
+            with open(path, "rb") as f:
+                saved_at, value = pickle.load(f)
+        except Exception:
+            return default
+
+        if time.time() - saved_at > self.ttl.get(kind, 0):
+            return default
+
+        try:
+            os.utime(path, None)  # marca acesso (LRU)
+        except OSError:
+            pass
+
+        return value
+
+    def set(self, kind, key, value):
+        path = self._path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump((time.time(), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            new_size = os.path.getsize(path)
+        except Exception as e:
+            print(f"Error writing cache {kind}/{key}: {e}")
+            return
+
+        with self.lock:
+            self.size += new_size - old_size
+
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def get_or_fetch(self, kind, key, fetch, force_refresh=False):
+        """Retorna o valor em cache; se ausente, expirado ou force_refresh, chama fetch()."""
+        if not force_refresh:
+            value = self.get(kind, key, default=_MISSING)
+            if value is not _MISSING:
+                return value
+
+        value = fetch()
+        self.set(kind, key, value)
+
+        return value
+
+    def _evict(self):
+        # remove os menos acessados até ficar em 80% do limite
+        target = self.max_bytes * 0.8
+
+        for path, _ in sorted(self._entries(), key=lambda entry: entry[1]):
+            if self.size <= target:
+                break
+
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self.size -= size
+            except OSError:
+                continue
+
+    def clear(self):
+        with self.lock:
+            for path, _ in list(self._entries()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+            self.size = 0
+
@@ -0,0 +1,169 @@
+import math
+import numbers
+
+# NaN / ausente: maior que qualquer número (fim da ordem crescente)
+NAN_SORT_VALUE = float("inf")
+
+
+def day_data_color_and_percent(prices, green_color="green", red_color="red"):
+    if len(prices)==0:
+        return "white", 0.0
+
+    percent = (prices[-1] - prices[0])*100.0/prices[0]
+
+    if prices[0]<prices[-1]:
+        return green_color, percent
+
+    return red_color, percent
+
+
+# ---------------- GETTERS ---------------- #
+
+def field(name, default=float("nan")):
+    """Lê stock_data[name]."""
+    return lambda stock, stock_data: stock_data.get(name, default)
+
+def ticker(stock, stock_data):
+    return stock
+
+def series_percent(name):
+    """Variação % da série de preços (ordena as colunas de mini-gráfico)."""
+    def getter(stock, stock_data):
+        _, percent = day_data_color_and_percent(stock_data.get(name, []))
+        return percent
+    return getter
+
+# ---------------- FORMATTERS ---------------- #
+
+def format_2f(value):
+    try:
+        return f"{value:.2f}"
+    except (TypeError, ValueError):
+        return f"{value}"
+
+def format_percent(value):
+    """Fração -> %."""
+    try:
+        return f"{value*100.0:.2f}"
+    except (TypeError, ValueError):
+        return f"{value}"
+
+def format_text(value):
+    return f"{value}"
+
+def format_empty(value):
+    return ""
+
+# ---------------- COLOR RULES ---------------- #
+# retornam a chave da cor no CONFIG ("green_color"/"red_color") ou None
+
+def positive_color(name):
+    def rule(stock_data):
+        return "green_color" if stock_data.get(name, float("nan")) > 0 else "red_color"
+    return rule
+
+def above_average_price_color(stock_data):
+    price = stock_data.get("currentPrice", float("nan"))
+    return "green_color" if price > stock_data.get("average_price", 0) else "red_color"
+
+# ---------------- COLUMN ---------------- #
+
+class Column:
+    """
+    Uma coluna da tabela: de onde vem o valor (getter), como aparece (formatter),
+    se é editável (parse converte o texto digitado), regra de cor e valor de ordenação.
+
+    getter(stock, stock_data) -> valor bruto
+    sort_key(stock, stock_data) -> valor de ordenação (padrão: o próprio getter)
+    color(stock_data) -> chave de cor do CONFIG ou None
+    """
+
+    def __init__(   self,
+                    key,
+                    getter,
+                    formatter=format_2f,
+                    parse=None,
+                    color=None,
+                    sort_key=None,
+                    numeric=True,
+                    sparkline=False ):
+        self.key = key
+        self.getter = getter
+        self.formatter = formatter
+        self.parse = parse
+        self.editable = parse is not None
+        self.color = color
+        self.sort_key = sort_key or getter
+        self.numeric = numeric
+        self.sparkline = sparkline
+
+    def text(self, stock, stock_data):
+        return self.formatter(self.getter(stock, stock_data))
+
+    def sort_value(self, stock, stock_data):
+        """Número (NaN -> NAN_SORT_VALUE) ou texto, conforme numeric."""
+        value = self.sort_key(stock, stock_data)
+
+        if not self.numeric:
+            return f"{value}"
+
+        if not isinstance(value, numbers.Real) or math.isnan(value):
+            return NAN_SORT_VALUE
+
+        return float(value)
+
+    def color_key(self, stock_data):
+        if self.color is None:
+            return None
+        return self.color(stock_data)
+
+
+def parse_int(text):
+    return int(float(text))
+
+def parse_float(text):
+    return float(text)
+
+# ---------------- REGISTRY ---------------- #
+
+COLUMNS = {}
+
+def register_column(column):
+    """Registra (ou substitui) a coluna usada para column.key na configuração da tabela."""
+    COLUMNS[column.key] = column
+    return column
+
+def get_column(key):
+    """Coluna registrada; chaves desconhecidas viram uma coluna vazia."""
+    column = COLUMNS.get(key)
+    if column is None:
+        column = Column(key, lambda stock, stock_data: "", formatter=format_empty, numeric=False)
+    return column
+
+
+register_column(Column("stock",          ticker, formatter=format_text, numeric=False))
+register_column(Column("quantity",       field("quantity", 0), formatter=format_text, parse=parse_int))
+register_column(Column("average_price",  field("average_price", 0), parse=parse_float))
+register_column(Column("currentPrice",   field("currentPrice"), color=above_average_price_color))
+register_column(Column("initial_amount", field("initial_amount")))
+register_column(Column("total_amount",   field("total_amount")))
+register_column(Column("capital_gain",   field("capital_gain"), color=positive_color("capital_gain")))
+register_column(Column("capital_gain_ratio", field("capital_gain_ratio"), formatter=format_percent,
+                       color=positive_color("capital_gain_ratio")))
+
+for name in ("longName", "sector", "industry"):
+    register_column(Column(name, field(name, ""), formatter=format_text, numeric=False))
+
+# mini-gráficos: o texto fica vazio, ordena pela variação %
+for name in ("daysData2y", "daysData6mo", "daysData1mo"):
+    register_column(Column(name, field(name, []), formatter=format_empty,
+                           sort_key=series_percent(name), sparkline=True))
+
+# dividendYield já vem em %, fiveYearAvgDividendYield também
+for name in ("dividendYield", "fiveYearAvgDividendYield",
+             "forwardPE", "trailingEps", "pegRatio", "bookValue", "priceToBook"):
+    register_column(Column(name, field(name)))
+
+# frações exibidas em %
+for name in ("returnOnEquity", "payoutRatio", "profitMargins"):
+    register_column(Column(name, field(name), formatter=format_percent))
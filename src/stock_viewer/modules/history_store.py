@@ -0,0 +1,165 @@
+import os
+import re
+import time
+import pickle
+
+import pandas as pd
+
+from stock_viewer.modules.cache import CACHE_ROOT
+
+DEFAULT_HISTORY_DIR = os.path.join(CACHE_ROOT, "history")
+
+# diferença relativa tolerada no pregão de sobreposição antes de forçar re-sync
+ADJUSTMENT_TOLERANCE = 1e-3
+
+
+def period_offset(period):
+    if period.endswith("mo"):
+        return pd.DateOffset(months=int(period[:-2]))
+    if period.endswith("y"):
+        return pd.DateOffset(years=int(period[:-1]))
+    if period.endswith("d"):
+        return pd.DateOffset(days=int(period[:-1]))
+    raise ValueError(f"Invalid period: {period}")
+
+
+def normalize_index(df):
+    if df is None or df.empty:
+        return df
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+
+    df = df.copy()
+    df.index = index.normalize()
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+
+    return df
+
+
+class HistoryStore:
+    """
+    Histórico diário OHLCV persistente, um arquivo por ticker.
+
+    Em cada update() baixa apenas os pregões depois do penúltimo já salvo.
+    O penúltimo pregão serve de sobreposição: se o preço dele mudou
+    (split, dividendo ajustado), o ticker é re-sincronizado por completo.
+    Também há re-sync completo a cada resync_days dias.
+
+    download(tickers, period=None, start=None) -> {ticker: DataFrame OHLCV}
+    """
+
+    def __init__(self, download, store_dir=DEFAULT_HISTORY_DIR, period="5y", resync_days=7):
+        self.download = download
+        self.store_dir = store_dir
+        self.period = period
+        self.resync_days = resync_days
+
+        os.makedirs(store_dir, exist_ok=True)
+
+    def _path(self, ticker):
+        name = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+        return os.path.join(self.store_dir, name + ".pkl")
+
+    def tickers(self):
+        """Tickers já salvos (nome do arquivo, sem a extensão)."""
+        try:
+            names = os.listdir(self.store_dir)
+        except OSError:
+            return []
+        return [name[:-4] for name in names if name.endswith(".pkl")]
+
+    def load(self, ticker):
+        """Retorna (DataFrame, full_sync) ou (None, 0) se o ticker não está salvo."""
+        try:
+            with open(self._path(ticker), "rb") as f:
+                entry = pickle.load(f)
+            return entry["data"], entry["full_sync"]
+        except Exception:
+            return None, 0
+
+    def save(self, ticker, df, full_sync):
+        path = self._path(ticker)
+        tmp_path = path + ".tmp"
+
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"data": df, "full_sync": full_sync}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error saving history {ticker}: {e}")
+
+    def update(self, tickers, force_full=False):
+        now = time.time()
+        result = {}
+
+        full = []
+        full_syncs = {}
+        incremental = {}  # start (YYYY-MM-DD) -> [tickers]
+
+        for ticker in tickers:
+            df, full_sync = self.load(ticker)
+            full_syncs[ticker] = full_sync
+
+            if df is not None and not df.empty:
+                result[ticker] = df
+
+            expired = now - full_sync > self.resync_days * 24 * 3600
+
+            if force_full or df is None or len(df) < 2 or expired:
+                full.append(ticker)
+            else:
+                start = df.index[-2].strftime("%Y-%m-%d")
+                incremental.setdefault(start, []).append(ticker)
+
+        # baixa só os pregões novos, agrupando tickers com o mesmo início
+        for start, group in incremental.items():
+            downloaded = self.download(group, start=start)
+
+            for ticker in group:
+                new = normalize_index(downloaded.get(ticker))
+                if new is None or new.empty:
+                    continue
+
+                old = result[ticker]
+                overlap = old.index[-2]
+
+                if overlap in new.index and self._adjusted(old.loc[overlap], new.loc[overlap]):
+                    full.append(ticker)
+                    continue
+
+                merged = pd.concat([old[old.index < new.index[0]], new])
+                merged = self._trim(merged)
+
+                self.save(ticker, merged, full_syncs[ticker])
+                result[ticker] = merged
+
+        if full:
+            downloaded = self.download(full, period=self.period)
+
+            for ticker in full:
+                df = normalize_index(downloaded.get(ticker))
+                if df is None or df.empty:
+                    continue
+
+                self.save(ticker, df, now)
+                result[ticker] = df
+
+        return result
+
+    def _adjusted(self, old_row, new_row):
+        try:
+            old_close = float(old_row["Close"])
+            new_close = float(new_row["Close"])
+        except Exception:
+            return False
+
+        if old_close == 0:
+            return new_close != 0
+
+        return abs(new_close - old_close) / abs(old_close) > ADJUSTMENT_TOLERANCE
+
+    def _trim(self, df):
+        start = df.index[-1] - period_offset(self.period)
+        return df[df.index > start]
@@ -0,0 +1,172 @@
+import os
+import time
+import threading
+from datetime import date
+
+import pandas as pd
+
+from stock_viewer.modules.cache import CACHE_ROOT
+from stock_viewer.modules.stock import close_series, bulk_history, HISTORY_STORE
+
+DEFAULT_B3_CACHE_DIR = os.path.join(CACHE_ROOT, "b3")
+
+# depois de uma falha ao montar o B3History, espera antes de tentar de novo
+B3_RETRY_SECONDS = 600
+
+# sufixo do ticker -> provedores em ordem de tentativa; "*" vale para o resto
+DEFAULT_ROUTES = {
+    "*": ["yahoo", "offline"]
+}
+
+
+def ticker_suffix(ticker):
+    """'PETR4.SA' -> '.SA'; '' se não houver sufixo."""
+    ticker = ticker.strip().upper()
+    if "." not in ticker:
+        return ""
+    return ticker[ticker.rindex("."):]
+
+
+class YahooProvider:
+    """Histórico do Yahoo finance pelo HISTORY_STORE (baixa só os pregões que faltam)."""
+    name = "yahoo"
+
+    def history(self, tickers, force_refresh=False):
+        return bulk_history(tickers, force_refresh=force_refresh)
+
+
+class OfflineProvider:
+    """Último histórico salvo no HISTORY_STORE, sem acessar a rede."""
+    name = "offline"
+
+    def history(self, tickers, force_refresh=False):
+        result = {}
+        for ticker in tickers:
+            df, _ = HISTORY_STORE.load(ticker)
+            series = close_series(df)
+            if not series.empty:
+                result[ticker] = series
+        return result
+
+
+class B3Provider:
+    """
+    Fechamentos dos arquivos COTAHIST da B3 (stockb3.B3History).
+    O B3History é montado numa thread própria, fora da atualização: no primeiro
+    uso baixa os anos que faltam, depois só os pregões novos do ano corrente.
+    Com o programa aberto, ele é recriado a cada REFRESH_INTERVAL ou na virada
+    do dia, para buscar os pregões novos e mover a janela até hoje.
+    Enquanto o primeiro não fica pronto, history() falha e o PriceProviders usa
+    o próximo provedor; cancelar a atualização não espera o download.
+    Os preços da B3 não são ajustados por proventos.
+    """
+    name = "b3"
+
+    def __init__(self, years_back=2, cache_dir=DEFAULT_B3_CACHE_DIR):
+        self.years_back = years_back
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self._b3 = None
+        self._loader = None
+        self._opened_at = 0
+        self._opened_on = None   # dia da última tentativa (com ou sem sucesso)
+
+    def _load(self):
+        from stock_viewer.modules.stockb3 import B3History
+        try:
+            b3 = B3History(years_back=self.years_back, cache_dir=self.cache_dir)
+        except Exception as e:
+            # continua com os dados já carregados; tenta de novo no próximo intervalo
+            print(f"Error B3 load: {e}")
+            b3 = None
+
+        with self.lock:
+            if b3 is not None:
+                self._b3 = b3
+            self._loader = None
+
+    def _due(self):
+        from stock_viewer.modules.stockb3 import REFRESH_INTERVAL
+        interval = REFRESH_INTERVAL if self._b3 is not None else B3_RETRY_SECONDS
+        return (time.time() - self._opened_at >= interval
+                or self._opened_on != date.today())
+
+    @property
+    def b3(self):
+        with self.lock:
+            if self._loader is None and self._due():
+                self._opened_at = time.time()
+                self._opened_on = date.today()
+                # daemon: fechar a janela não espera o download
+                self._loader = threading.Thread(target=self._load, daemon=True)
+                self._loader.start()
+
+            if self._b3 is None:
+                raise RuntimeError("B3 data not loaded yet")
+            return self._b3
+
+    def history(self, tickers, force_refresh=False):
+        b3 = self.b3
+        result = {}
+        for ticker in tickers:
+            # todos os anos carregados (years_back + o ano corrente)
+            rows = b3.get_history(ticker, months=12 * (self.years_back + 1), columns=("date", "close"))
+            if len(rows["date"]) == 0:
+                continue
+
+            result[ticker] = pd.Series(rows["close"], index=pd.DatetimeIndex(rows["date"]))
+        return result
+
+
+class PriceProviders:
+    """
+    Escolhe os provedores de histórico pelo sufixo do ticker, com fallback:
+    o que um provedor não devolver (ou se ele falhar) vai para o próximo da lista.
+
+    routes: {".SA": ["b3", "yahoo"], "*": ["yahoo", "offline"]}
+    """
+
+    def __init__(self, providers, routes=None):
+        self.providers = {provider.name: provider for provider in providers}
+        self.routes = {suffix.upper(): names for suffix, names in (routes or DEFAULT_ROUTES).items()}
+
+    def chain(self, ticker):
+        names = self.routes.get(ticker_suffix(ticker), self.routes.get("*", ["yahoo"]))
+        return [self.providers[name] for name in names if name in self.providers]
+
+    def history(self, tickers, force_refresh=False):
+        """{ticker: pd.Series} de fechamentos; tickers sem dados em nenhum provedor não aparecem."""
+        pending = {}  # tupla de provedores -> tickers
+        for ticker in tickers:
+            pending.setdefault(tuple(self.chain(ticker)), []).append(ticker)
+
+        result = {}
+        for chain, group in pending.items():
+            for provider in chain:
+                if not group:
+                    break
+
+                try:
+                    found = provider.history(group, force_refresh=force_refresh)
+                except Exception as e:
+                    print(f"Error {provider.name} provider: {e}")
+                    continue
+
+                result.update(found)
+                group = [ticker for ticker in group if ticker not in found]
+
+        return result
+
+
+def providers_from_config(config):
+    """Monta o PriceProviders a partir das chaves price_providers, b3_years_back e b3_cache_dir."""
+    cache_dir = os.path.expanduser(config.get("b3_cache_dir") or DEFAULT_B3_CACHE_DIR)
+
+    return PriceProviders(
+        [
+            YahooProvider(),
+            B3Provider(years_back=config.get("b3_years_back", 2), cache_dir=cache_dir),
+            OfflineProvider(),
+        ],
+        routes=config.get("price_providers")
+    )
@@ -0,0 +1,67 @@
+import threading
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from stock_viewer.modules.stock import agregate_more_stock_info, TickerScheduler
+
+
+class RefreshWorker(QObject):
+    """
+    Executa agregate_more_stock_info fora da thread da GUI.
+    Os resultados chegam à GUI apenas pelos sinais.
+    """
+    result   = pyqtSignal(str, object)   # stock_name, dict do ticker
+    progress = pyqtSignal(int, int)      # k, total
+    error    = pyqtSignal(str, str)      # stock_name, mensagem
+    stats    = pyqtSignal(object)        # {"remote", "disk", "saved"} no fim
+    finished = pyqtSignal(bool)          # True se foi cancelado
+
+    def __init__(self, stocks_data, force_refresh=False, fields=None, providers=None):
+        super().__init__()
+        # cópia: a GUI continua livre para editar o próprio stocks_data
+        self.stocks_data = {name: dict(data) for name, data in stocks_data.items()}
+        self.force_refresh = force_refresh
+        self.fields = fields
+        self.providers = providers
+        self.cancel_event = threading.Event()
+        self.scheduler = TickerScheduler(self.stocks_data.keys())
+
+    def run(self):
+        try:
+            agregate_more_stock_info(
+                self.stocks_data,
+                func_progress=self.progress.emit,
+                func_result=self.result.emit,
+                func_error=self.error.emit,
+                func_stats=self.stats.emit,
+                cancel_event=self.cancel_event,
+                scheduler=self.scheduler,
+                force_refresh=self.force_refresh,
+                fields=self.fields,
+                providers=self.providers
+            )
+        except Exception as e:
+            self.error.emit("", str(e))
+
+        self.finished.emit(self.cancel_event.is_set())
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def prioritize(self, levels):
+        """Pode ser chamado da thread da GUI (ex.: ao trocar de grupo)."""
+        self.scheduler.prioritize(levels)
+
+
+def start_refresh_thread(worker, parent=None):
+    """Move o worker para uma QThread nova, conecta a limpeza e inicia."""
+    thread = QThread(parent)
+    worker.moveToThread(thread)
+
+    thread.started.connect(worker.run)
+    worker.finished.connect(thread.quit)
+    worker.finished.connect(worker.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+
+    thread.start()
+    return thread
@@ -0,0 +1,162 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from PyQt5.QtWidgets import QStyledItemDelegate
+from PyQt5.QtGui import QColor, QPainter, QPainterPath, QPen, QPixmap, QPolygonF
+from PyQt5.QtCore import QPointF
+
+from stock_viewer.modules.table_model import SPARKLINE_ROLE, SPARKLINE_KEY_ROLE
+
+SPARKLINE_BACKGROUND = "black"
+SPARKLINE_MARGIN = 2
+
+# memória máxima das imagens de mini-gráfico em cache
+SPARKLINE_CACHE_BYTES = 32 * 1024 * 1024
+
+
+def downsample_minmax(prices, width):
+    """
+    Reduz a série a no máximo 2 pontos por pixel (mínimo e máximo de cada coluna),
+    na ordem em que aparecem: o traçado fica igual ao da série completa.
+    Retorna (x, y) com x em 0..1.
+    """
+    y = np.asarray(prices, dtype=float)
+    n = len(y)
+
+    if n < 2 or n <= 2 * width:
+        return np.linspace(0.0, 1.0, n), y
+
+    edges = np.linspace(0, n, width + 1).astype(np.int64)
+    starts = edges[:-1]
+
+    low  = np.minimum.reduceat(y, starts)
+    high = np.maximum.reduceat(y, starts)
+
+    # posição de min e max dentro de cada coluna, para manter a ordem temporal
+    index = np.arange(n)
+    bucket = np.searchsorted(edges, index, side="right") - 1
+    low_pos  = np.full(width, n)
+    high_pos = np.full(width, n)
+    np.minimum.at(low_pos,  bucket, np.where(y == low[bucket],  index, n))
+    np.minimum.at(high_pos, bucket, np.where(y == high[bucket], index, n))
+
+    first_is_low = low_pos <= high_pos
+    xs = np.empty(2 * width)
+    ys = np.empty(2 * width)
+    xs[0::2] = np.where(first_is_low, low_pos, high_pos)
+    xs[1::2] = np.where(first_is_low, high_pos, low_pos)
+    ys[0::2] = np.where(first_is_low, low, high)
+    ys[1::2] = np.where(first_is_low, high, low)
+
+    return xs / (n - 1), ys
+
+
+def sparkline_path(prices, width, height, margin=SPARKLINE_MARGIN):
+    """QPainterPath da série em coordenadas locais (0, 0)-(width, height)."""
+    path = QPainterPath()
+
+    inner_w = max(width - 2 * margin, 1)
+    inner_h = max(height - 2 * margin, 1)
+
+    x, y = downsample_minmax(prices, inner_w)
+    if len(y) == 0:
+        return path
+
+    y_min = np.nanmin(y)
+    y_range = np.nanmax(y) - y_min or 1.0
+
+    px = margin + x * inner_w
+    py = margin + (1.0 - (y - y_min) / y_range) * inner_h
+
+    path.addPolygon(QPolygonF([QPointF(a, b) for a, b in zip(px.tolist(), py.tolist())]))
+    return path
+
+
+class PixmapCache:
+    """
+    Cache LRU de QPixmap limitado em bytes (largura x altura x 4).
+    """
+
+    def __init__(self, max_bytes=SPARKLINE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.pixmaps = OrderedDict()
+
+    @staticmethod
+    def _bytes(pixmap):
+        return pixmap.width() * pixmap.height() * 4
+
+    def get(self, key):
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(key)
+        return pixmap
+
+    def put(self, key, pixmap):
+        old = self.pixmaps.pop(key, None)
+        if old is not None:
+            self.size -= self._bytes(old)
+
+        self.pixmaps[key] = pixmap
+        self.size += self._bytes(pixmap)
+
+        while self.size > self.max_bytes and len(self.pixmaps) > 1:
+            _, removed = self.pixmaps.popitem(last=False)
+            self.size -= self._bytes(removed)
+
+    def clear(self):
+        self.pixmaps.clear()
+        self.size = 0
+
+
+class SparklineDelegate(QStyledItemDelegate):
+    """
+    Desenha as colunas de mini-gráfico com QPainter (sem um widget por célula).
+    Células sem SPARKLINE_ROLE usam o desenho padrão.
+
+    Cada imagem fica no PixmapCache com a chave
+    (ticker, coluna, versão dos dados, tamanho da célula, cor): trocar de grupo,
+    reordenar ou rolar reaproveita as imagens; só dados novos do ticker invalidam.
+    """
+
+    def __init__(self, parent=None, line_width=1, max_bytes=SPARKLINE_CACHE_BYTES):
+        super().__init__(parent)
+        self.line_width = line_width
+        self.background = QColor(SPARKLINE_BACKGROUND)
+        self.cache = PixmapCache(max_bytes)
+
+    def render(self, prices, width, height, color, ratio=1.0):
+        pixmap = QPixmap(int(width * ratio), int(height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(self.background)
+
+        if len(prices) > 0:
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing, True)
+            painter.setPen(QPen(QColor(color), self.line_width))
+            painter.drawPath(sparkline_path(prices, width, height))
+            painter.end()
+
+        return pixmap
+
+    def paint(self, painter, option, index):
+        series_key = index.data(SPARKLINE_KEY_ROLE)
+        if series_key is None:
+            super().paint(painter, option, index)
+            return
+
+        rect = option.rect
+        ratio = painter.device().devicePixelRatioF()
+
+        key = (series_key, rect.width(), rect.height(), ratio)
+
+        pixmap = self.cache.get(key)
+        if pixmap is None:
+            # só aqui a série é lida do modelo
+            color = series_key[-1]
+            prices = index.data(SPARKLINE_ROLE) or []
+            pixmap = self.render(prices, rect.width(), rect.height(), color, ratio)
+            self.cache.put(key, pixmap)
+
+        painter.drawPixmap(rect.topLeft(), pixmap)
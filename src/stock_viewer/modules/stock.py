@@ -7,53 +7,227 @@ import math
 import pandas as pd
 import numpy as np
 import time
+import threading
+import heapq
 import tempfile
 import os
 
-from PyQt5.QtWidgets import QMessageBox
-from PyQt5.QtWidgets import QApplication
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from stock_viewer.modules.cache import DiskCache
+from stock_viewer.modules.history_store import HistoryStore, period_offset
 
 temp_dir = tempfile.gettempdir()
 yf.set_tz_cache_location(os.path.join(temp_dir, "yf_cache"))
 
+# ---------------- CACHE ---------------- #
+
+# quotes em segundos, info/dividendos diário, demonstrativos trimestral
+CACHE = DiskCache()
+
 # ---------------- PRICE HISTORY ---------------- #
 
-def price_hist(stock, period="6mo", interval="1d"):
+# histórico canônico: o período mais longo usado por qualquer consumidor
+CANONICAL_PERIOD = "5y"
+
+def close_series(hist):
+    if hist is None or hist.empty:
+        return pd.Series(dtype=float)
+
+    if "Adj Close" in hist.columns:
+        return hist["Adj Close"].dropna()
+
+    if "Close" in hist.columns:
+        return hist["Close"].dropna()
+
+    return pd.Series(dtype=float)
+
+def stock_history(stock, period=CANONICAL_PERIOD):
     for p in [period, "5d"]:
         try:
-            hist = stock.history(period=p, interval="1d")
+            series = close_series(stock.history(period=p, interval="1d"))
+
+            if not series.empty:
+                return series
+
+        except Exception:
+            continue
+
+    return pd.Series(dtype=float)
+
+def bulk_download(tickers, period=None, start=None, chunk_size=50):
+    """
+    Baixa o histórico OHLCV de vários tickers com yf.download (multi-ticker),
+    em lotes de chunk_size, e separa o resultado por ticker.
+    Usa `start` (YYYY-MM-DD) se informado, senão `period`.
+    Retorna {ticker: DataFrame}; tickers sem dados não aparecem.
+    """
+    tickers = list(tickers)
+    result = {}
+
+    if start is not None:
+        kwargs = {"start": start}
+    else:
+        kwargs = {"period": period or CANONICAL_PERIOD}
+
+    for i in range(0, len(tickers), chunk_size):
+        chunk = tickers[i:i + chunk_size]
+
+        try:
+            df = yf.download(
+                chunk,
+                interval="1d",
+                group_by="ticker",
+                actions=False,
+                progress=False,
+                threads=True,
+                **kwargs
+            )
+        except Exception as e:
+            print(f"Error bulk download ({kwargs}): {e}")
+            continue
 
-            if hist is None or hist.empty:
+        if df is None or df.empty:
+            continue
+
+        for ticker in chunk:
+            try:
+                if isinstance(df.columns, pd.MultiIndex):
+                    hist = df[ticker]
+                else:
+                    hist = df
+            except KeyError:
                 continue
 
-            if "Adj Close" in hist.columns:
-                prices = hist["Adj Close"].dropna().tolist()
-            else:
-                prices = hist["Close"].dropna().tolist()
+            hist = hist.dropna(how="all")
+
+            if not hist.empty:
+                result[ticker] = hist
+
+    return result
+
+# histórico OHLCV persistente; cada refresh baixa só os pregões que faltam
+HISTORY_STORE = HistoryStore(download=bulk_download, period=CANONICAL_PERIOD)
+
+def bulk_history(tickers, force_refresh=False):
+    """{ticker: pd.Series} de fechamentos, lido do HISTORY_STORE (atualizado antes)."""
+    stored = HISTORY_STORE.update(tickers, force_full=force_refresh)
+
+    result = {}
+    for ticker, df in stored.items():
+        series = close_series(df)
+        if not series.empty:
+            result[ticker] = series
+
+    return result
+
+def history_window(hist, period="6mo"):
+    """Últimos `period` do histórico canônico, como lista de preços."""
+    if hist is None or hist.empty:
+        return []
+
+    start = hist.index[-1] - period_offset(period)
+
+    return hist[hist.index > start].tolist()
+
+# ---------------- SNAPSHOT ---------------- #
+
+_UNSET = object()
+
+class TickerSnapshot:
+    """
+    Envolve um yf.Ticker e busca cada dado (fast_info, info, dividends,
+    history, income_stmt) no máximo uma vez por refresh.
+
+    stats conta os acessos: "remote" foram à rede, "disk" vieram do CACHE
+    e "saved" foram respondidos pela própria snapshot.
+    """
+
+    def __init__(self, ticker, hist=None, limiter=None, force_refresh=False):
+        self.ticker = ticker
+        self.stock = yf.Ticker(ticker)
+        self.limiter = limiter
+        self.force_refresh = force_refresh
+
+        self._data = {}
+        if hist is not None and not hist.empty:
+            self._data["history"] = hist
+
+        self.stats = {"remote": 0, "disk": 0, "saved": 0}
+
+    def _remote(self, fetch):
+        def call():
+            if self.limiter is not None:
+                self.limiter.acquire()
+            self.stats["remote"] += 1
+            return fetch()
+        return call
 
-            if prices:
-                return prices
+    def _get(self, name, fetch, cache_kind=None, default=None):
+        value = self._data.get(name, _UNSET)
 
+        if value is not _UNSET:
+            self.stats["saved"] += 1
+            return value
+
+        remote_before = self.stats["remote"]
+
+        try:
+            if cache_kind is None:
+                value = self._remote(fetch)()
+            else:
+                value = CACHE.get_or_fetch(cache_kind, self.ticker, self._remote(fetch), self.force_refresh)
         except Exception:
-            continue
+            value = default
+
+        if cache_kind is not None and self.stats["remote"] == remote_before:
+            self.stats["disk"] += 1
+
+        self._data[name] = value
+        return value
+
+    @property
+    def fast_info(self):
+        # objeto preguiçoso do yfinance: a rede só é usada ao ler os campos
+        if "fast_info" not in self._data:
+            self._data["fast_info"] = self.stock.fast_info
+        return self._data["fast_info"]
+
+    @property
+    def last_price(self):
+        return self._get("last_price", lambda: self.fast_info.get("last_price"), cache_kind="quote")
+
+    @property
+    def info(self):
+        return self._get("info", lambda: self.stock.get_info() or {}, cache_kind="info", default={})
+
+    @property
+    def dividends(self):
+        return self._get("dividends", lambda: self.stock.dividends, cache_kind="dividends")
 
-    return []
+    @property
+    def income_stmt(self):
+        return self._get("income_stmt", lambda: self.stock.income_stmt, cache_kind="statements")
+
+    @property
+    def history(self):
+        return self._get("history", lambda: stock_history(self.stock), default=pd.Series(dtype=float))
 
 # ---------------- CURRENT PRICE ---------------- #
 
-def get_current_price(stock):
+def get_current_price(snap):
     try:
-        price = stock.fast_info.get("last_price")
+        price = snap.last_price
         if isinstance(price, (int, float)):
             return price
     except Exception:
         pass
 
     try:
-        hist = price_hist(stock, period="1d", interval="1m")
-        
+        hist = snap.history
+
         if len(hist)>0:
-            return float(hist[-1])
+            return float(hist.iloc[-1])
     except Exception:
         pass
 
@@ -61,21 +235,21 @@ def get_current_price(stock):
 
 # ---------------- DIVIDENDS ---------------- #
 
-def get_dividend_yield(stock, info):
+def get_dividend_yield(snap):
     try:
-        dy = info.get("dividendYield")
+        dy = snap.info.get("dividendYield")
         if isinstance(dy, (int, float)) and dy > 0:
             return dy
     except Exception:
         pass
 
     try:
-        dividends = stock.dividends
+        dividends = snap.dividends
         if dividends is None or dividends.empty:
             return float("nan")
 
         dividends_ttm = dividends.last("365D").sum()
-        price = get_current_price(stock)
+        price = get_current_price(snap)
 
         if price > 0:
             return dividends_ttm / price
@@ -84,26 +258,28 @@ def get_dividend_yield(stock, info):
 
     return float("nan")
 
-def get_five_year_avg_dividend_yield(stock, info):
+def get_five_year_avg_dividend_yield(snap):
     try:
-        dy5 = info.get("fiveYearAvgDividendYield")
+        dy5 = snap.info.get("fiveYearAvgDividendYield")
         if isinstance(dy5, (int, float)) and dy5 > 0:
             return dy5
     except Exception:
         pass
 
     try:
-        dividends = stock.dividends
+        dividends = snap.dividends
         if dividends is None or dividends.empty:
             return float("nan")
 
-        df = pd.DataFrame({"dividend": dividends})
-        yearly_div = df["dividend"].resample("Y").sum()
+        hist = snap.history
+
+        # agrupa por ano calendário (evita conflito de timezone entre as séries)
+        yearly_div = dividends.groupby(dividends.index.year).sum()
 
-        prices = price_hist(stock, period="5y")
-        yearly_price = np.mean(prices)
+        prices = hist[hist.index > hist.index[-1] - period_offset("5y")]
+        yearly_price = prices.groupby(prices.index.year).mean()
 
-        merged = pd.concat([yearly_div, pd.Series(yearly_price)], axis=1)
+        merged = pd.concat([yearly_div, yearly_price], axis=1)
         merged.columns = ["dividend", "price"]
         merged = merged.dropna()
 
@@ -123,7 +299,9 @@ def get_five_year_avg_dividend_yield(stock, info):
 
 # ---------------- PE / PEG ---------------- #
 
-def get_forward_pe(stock, info):
+def get_forward_pe(snap):
+    info = snap.info
+
     try:
         pe = info.get("forwardPE")
         if isinstance(pe, (int, float)) and pe > 0:
@@ -133,7 +311,7 @@ def get_forward_pe(stock, info):
 
     try:
         eps_fwd = info.get("forwardEps")
-        price = get_current_price(stock)
+        price = get_current_price(snap)
 
         if isinstance(eps_fwd, (int, float)) and eps_fwd > 0 and price > 0:
             return price / eps_fwd
@@ -142,7 +320,9 @@ def get_forward_pe(stock, info):
 
     return float("nan")
 
-def get_peg_ratio(stock, info, years=3):
+def get_peg_ratio(snap, years=3):
+    info = snap.info
+
     peg = info.get("pegRatio")
     if isinstance(peg, (int, float)) and peg > 0:
         return float(peg)
@@ -152,7 +332,7 @@ def get_peg_ratio(stock, info, years=3):
         if pe is None or pe <= 0:
             return math.nan
 
-        income = stock.income_stmt
+        income = snap.income_stmt
         if income is None or income.empty:
             return math.nan
 
@@ -181,8 +361,9 @@ def get_peg_ratio(stock, info, years=3):
 
 # ---------------- LONG NAME ---------------- #
 
-def get_long_name(stock, info):
+def get_long_name(snap):
     try:
+        info = snap.info
         name = info.get("longName") or info.get("shortName")
         if isinstance(name, str) and name.strip():
             return name.strip()
@@ -190,7 +371,7 @@ def get_long_name(stock, info):
         pass
 
     try:
-        fi = stock.fast_info
+        fi = snap.fast_info
         if isinstance(fi, dict):
             name = fi.get("shortName")
             if isinstance(name, str) and name.strip():
@@ -198,98 +379,317 @@ def get_long_name(stock, info):
     except Exception:
         pass
 
-    ticker = getattr(stock, "ticker", "N/A")
+    ticker = snap.ticker
 
     if ticker.endswith(".SA"):
         return f"{ticker.replace('.SA','')} (B3)"
 
     return ticker
 
-# ---------------- MAIN ---------------- #
-
-def agregate_more_stock_info(stocks_data, progress=None, parent=None):
-    if progress is not None:
-        progress.setMaximum(len(stocks_data))
+# ---------------- RATE LIMIT ---------------- #
+
+class TokenBucket:
+    """Rate limiter shared by every fetch thread (rate in tokens per second)."""
+
+    def __init__(self, rate=8.0, capacity=5):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.timestamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1.0):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.timestamp) * self.rate)
+                self.timestamp = now
+
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+
+                wait = (tokens - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+# ---------------- SCHEDULER ---------------- #
+
+class TickerScheduler:
+    """
+    Fila de tickers pendentes ordenada por prioridade.
+
+    prioritize([nivel0, nivel1, ...]) recebe listas de tickers; o nível 0 sai
+    primeiro, tickers fora de qualquer nível saem por último, na ordem original.
+    Pode ser chamado de outra thread durante o refresh.
+    """
+
+    def __init__(self, tickers):
+        self.lock = threading.Lock()
+        self.order = {ticker: k for k, ticker in enumerate(tickers)}
+        self.pending = set(self.order)
+        self.priority = {}
+        self.lowest = 0
+
+    def prioritize(self, levels):
+        priority = {}
+        for level, tickers in enumerate(levels):
+            for ticker in tickers:
+                priority.setdefault(ticker, level)
+
+        with self.lock:
+            self.priority = priority
+            # níveis vazios também contam: fora da lista fica sempre depois do último
+            self.lowest = len(levels)
+
+    def _rank(self, ticker):
+        return (self.priority.get(ticker, self.lowest), self.order.get(ticker, len(self.order)))
+
+    def pop(self, n=1):
+        with self.lock:
+            tickers = heapq.nsmallest(n, self.pending, key=self._rank)
+            self.pending.difference_update(tickers)
+
+        return tickers
+
+    def first(self, tickers):
+        """O ticker de maior prioridade atual entre tickers (já retirados da fila)."""
+        with self.lock:
+            return min(tickers, key=self._rank)
+
+    def outranks(self, tickers):
+        """True se algum ticker pendente tem prioridade maior que todos de tickers."""
+        with self.lock:
+            if not self.pending:
+                return False
+            if not tickers:
+                return True
+            return min(map(self._rank, self.pending)) < min(map(self._rank, tickers))
+
+    def __len__(self):
+        with self.lock:
+            return len(self.pending)
+
+# ---------------- FIELDS ---------------- #
+
+def info_field(key, default=float("nan")):
+    return lambda snap: snap.info.get(key, default)
+
+def history_field(period):
+    return lambda snap: history_window(snap.history, period)
+
+# campo (chave de coluna) -> função que o calcula a partir da TickerSnapshot
+FIELD_GETTERS = {
+    "currentPrice":             get_current_price,
+    "longName":                 get_long_name,
+    "dividendYield":            get_dividend_yield,
+    "fiveYearAvgDividendYield": get_five_year_avg_dividend_yield,
+    "forwardPE":                get_forward_pe,
+    "pegRatio":                 get_peg_ratio,
+    "profitMargins":            info_field("profitMargins"),
+    "trailingEps":              info_field("trailingEps"),
+    "bookValue":                info_field("bookValue"),
+    "priceToBook":              info_field("priceToBook"),
+    "returnOnEquity":           info_field("returnOnEquity"),
+    "payoutRatio":              info_field("payoutRatio"),
+    "industry":                 info_field("industry", "N/A"),
+    "sector":                   info_field("sector", "N/A"),
+    "currency":                 info_field("currency", "N/A"),
+    "daysData2y":               history_field("2y"),
+    "daysData6mo":              history_field("6mo"),
+    "daysData1mo":              history_field("1mo"),
+}
+
+# dados remotos que cada campo pode precisar
+FIELD_DATASETS = {
+    "currentPrice":             {"quote", "history"},
+    "longName":                 {"info"},
+    "dividendYield":            {"info", "dividends", "quote", "history"},
+    "fiveYearAvgDividendYield": {"info", "dividends", "history"},
+    "forwardPE":                {"info", "quote", "history"},
+    "pegRatio":                 {"info", "statements"},
+    "profitMargins":            {"info"},
+    "trailingEps":              {"info"},
+    "bookValue":                {"info"},
+    "priceToBook":              {"info"},
+    "returnOnEquity":           {"info"},
+    "payoutRatio":              {"info"},
+    "industry":                 {"info"},
+    "sector":                   {"info"},
+    "currency":                 {"info"},
+    "daysData2y":               {"history"},
+    "daysData6mo":              {"history"},
+    "daysData1mo":              {"history"},
+}
+
+# sempre calculados: totais do grupo e gráficos de desempenho dependem deles
+BASE_FIELDS = {"currentPrice", "daysData2y"}
+
+def fields_for_columns(column_keys):
+    """Campos remotos a buscar para as colunas configuradas na tabela."""
+    return BASE_FIELDS | (set(column_keys) & set(FIELD_GETTERS))
+
+def required_datasets(fields):
+    datasets = set()
+    for field in fields:
+        datasets |= FIELD_DATASETS.get(field, set())
+    return datasets
+
+def update_amounts(data):
+    price = data.get('currentPrice', float("nan"))
+
+    data['total_amount'] = price * data['quantity']
+
+    data['initial_amount'] = data['average_price'] * data['quantity']
+
+    data['capital_gain'] = data['total_amount'] - data['initial_amount']
 
-    k = 0
-
-    for stock_name in stocks_data:
-        try:
-            stock = yf.Ticker(stock_name)
-
-            try:
-                info = stock.get_info() or {}
-            except Exception:
-                info = {}
-
-            if progress is not None:
-                QApplication.processEvents()
-                progress.setValue(k + 1)
-
-            stocks_data[stock_name]['currentPrice'] = get_current_price(stock)
-
-            stocks_data[stock_name]['total_amount'] = (
-                stocks_data[stock_name]['currentPrice'] * stocks_data[stock_name]['quantity']
-            )
-
-            stocks_data[stock_name]['initial_amount'] = (
-                stocks_data[stock_name]['average_price'] * stocks_data[stock_name]['quantity']
-            )
-
-            stocks_data[stock_name]['capital_gain'] = (
-                stocks_data[stock_name]['total_amount'] - stocks_data[stock_name]['initial_amount']
-            )
-
-            try:
-                stocks_data[stock_name]['capital_gain_ratio'] = (
-                    stocks_data[stock_name]['capital_gain'] / stocks_data[stock_name]['initial_amount']
-                )
-            except Exception:
-                stocks_data[stock_name]['capital_gain_ratio'] = 0.0
+    try:
+        data['capital_gain_ratio'] = data['capital_gain'] / data['initial_amount']
+    except Exception:
+        data['capital_gain_ratio'] = 0.0
 
-            stocks_data[stock_name]['longName'] = get_long_name(stock, info)
+    return data
 
-            stocks_data[stock_name]['dividendYield'] = get_dividend_yield(stock, info)
+# ---------------- PER TICKER ---------------- #
 
-            stocks_data[stock_name]['fiveYearAvgDividendYield'] = get_five_year_avg_dividend_yield(stock, info)
+def fetch_stock_info(stock_name, stock_data, limiter=None, hist=None, force_refresh=False, fields=None):
+    """
+    Calcula apenas os campos pedidos (todos se fields=None); a TickerSnapshot
+    só baixa os dados que esses campos realmente acessarem.
+    Retorna (dict do ticker atualizado, stats da TickerSnapshot).
+    """
+    data = dict(stock_data)
 
-            stocks_data[stock_name]['profitMargins'] = info.get('profitMargins', float("nan"))
+    snap = TickerSnapshot(stock_name, hist=hist, limiter=limiter, force_refresh=force_refresh)
 
-            stocks_data[stock_name]['forwardPE'] = get_forward_pe(stock, info)
+    for field, getter in FIELD_GETTERS.items():
+        if fields is None or field in fields:
+            data[field] = getter(snap)
 
-            stocks_data[stock_name]['pegRatio'] = get_peg_ratio(stock, info)
+    update_amounts(data)
 
-            stocks_data[stock_name]['trailingEps'] = info.get('trailingEps', float("nan"))
+    return data, snap.stats
 
-            stocks_data[stock_name]['bookValue'] = info.get('bookValue', float("nan"))
+# ---------------- MAIN ---------------- #
 
-            stocks_data[stock_name]['priceToBook'] = info.get('priceToBook', float("nan"))
+def agregate_more_stock_info(   stocks_data,
+                                func_progress=None,
+                                func_result=None,
+                                func_error=None,
+                                func_stats=None,
+                                cancel_event=None,
+                                scheduler=None,
+                                max_workers=8,
+                                rate=8.0,
+                                history_batch=25,
+                                force_refresh=False,
+                                fields=None,
+                                providers=None ):
+    """
+    Busca os dados de todos os tickers em paralelo (max_workers threads).
+    O TokenBucket limita o total de requisições por segundo.
+    Com force_refresh=True o cache em disco é ignorado (e regravado).
+    fields limita os campos calculados (ver fields_for_columns); None = todos.
+    providers (providers.PriceProviders) escolhe a origem do histórico por
+    sufixo do ticker; None = Yahoo via HISTORY_STORE.
+
+    A ordem vem do scheduler (TickerScheduler): o histórico é baixado em lotes
+    de history_batch tickers na ordem de prioridade, e cada ticker só é
+    submetido quando há thread livre, escolhido pela prioridade atual entre os
+    que já têm histórico; se um pendente passar à frente de todos eles, o próximo
+    lote é carregado antes. Assim mudanças de prioridade valem na próxima submissão.
+
+    Não toca na GUI; pode rodar fora da thread principal:
+        func_progress(k, total)        após cada ticker
+        func_result(stock_name, data)  com o dict atualizado do ticker
+        func_error(stock_name, msg)    quando o ticker falha
+        func_stats(stats)              no fim, com os contadores das TickerSnapshot:
+                                       {"remote", "disk", "saved"} (chamadas à rede,
+                                       vindas do cache em disco, poupadas pela snapshot)
+    Se cancel_event (threading.Event) for acionado, os tickers pendentes são descartados.
+    """
+    total = len(stocks_data)
+
+    if scheduler is None:
+        scheduler = TickerScheduler(stocks_data.keys())
+
+    if func_progress is not None:
+        func_progress(0, total)
+
+    limiter = TokenBucket(rate=rate, capacity=max_workers)
+
+    need_history = fields is None or "history" in required_datasets(fields)
+
+    ready = []      # tickers com histórico já carregado, ainda não submetidos
+    histories = {}
 
-            stocks_data[stock_name]['returnOnEquity'] = info.get('returnOnEquity', float("nan"))
+    k = 0
+    stats = {"remote": 0, "disk": 0, "saved": 0}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+
+        while running or ready or len(scheduler) > 0:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+
+            # completa as threads livres com os próximos tickers
+            while len(running) < max_workers and (ready or len(scheduler) > 0):
+                if scheduler.outranks(ready):
+                    # um único histórico longo por ticker, do store incremental
+                    batch = scheduler.pop(history_batch)
+                    if need_history and providers is not None:
+                        histories.update(providers.history(batch, force_refresh=force_refresh))
+                    elif need_history:
+                        histories.update(bulk_history(batch, force_refresh=force_refresh))
+                    ready.extend(batch)
+
+                # prioridade atual (o grupo exibido pode ter mudado desde o lote)
+                stock_name = scheduler.first(ready)
+                ready.remove(stock_name)
+
+                future = executor.submit(
+                    fetch_stock_info,
+                    stock_name,
+                    stocks_data[stock_name],
+                    limiter,
+                    histories.pop(stock_name, None),
+                    force_refresh,
+                    fields
+                )
+                running[future] = stock_name
 
-            stocks_data[stock_name]['payoutRatio'] = info.get('payoutRatio', float("nan"))
+            if not running:
+                continue
 
-            stocks_data[stock_name]['industry'] = info.get('industry', 'N/A')
+            done, _ = wait(running, timeout=0.1, return_when=FIRST_COMPLETED)
 
-            stocks_data[stock_name]['sector'] = info.get('sector', 'N/A')
+            for future in done:
+                stock_name = running.pop(future)
 
-            stocks_data[stock_name]["currency"] = info.get("currency", 'N/A')
+                try:
+                    stocks_data[stock_name], snap_stats = future.result()
 
-            stocks_data[stock_name]["daysData2y"] = price_hist(stock, period="2y")
+                    for key in stats:
+                        stats[key] += snap_stats[key]
 
-            stocks_data[stock_name]["daysData6mo"] = price_hist(stock, period="6mo")
+                    if func_result is not None:
+                        func_result(stock_name, stocks_data[stock_name])
 
-            stocks_data[stock_name]["daysData1mo"] = price_hist(stock, period="1mo")
+                except Exception as e:
+                    print(f"Error {stock_name}: {e}")
 
-            time.sleep(0.4)
+                    if func_error is not None:
+                        func_error(stock_name, str(e))
 
-        except Exception as e:
-            print(f"Error {stock_name}: {e}")
+                k += 1
 
-            if parent is not None:
-                QMessageBox.critical(parent, "Error getting data", f"{stock_name}:\n\n{str(e)}")
+                if func_progress is not None:
+                    func_progress(k, total)
 
-        k += 1
+    if func_stats is not None:
+        func_stats(stats)
 
     return stocks_data
 
@@ -1,8 +1,13 @@
 import requests
 import zipfile
-import io
 from datetime import datetime, timedelta
 import os
+import json
+import shutil
+import time
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from PyQt5.QtWidgets import QApplication
 
 def remove_sa_suffix(ticker: str) -> str:
@@ -12,6 +17,450 @@ def remove_sa_suffix(ticker: str) -> str:
     return ticker
 
 
+# ==========================
+# LAYOUT COTAHIST (registro 01)
+# ==========================
+RECORD_LEN = 245
+
+# (início, fim) 0-based, fim exclusivo
+FIELD_DATE     = (2, 10)     # DATPRE   AAAAMMDD
+FIELD_CODE     = (12, 24)    # CODNEG
+FIELD_NAME     = (27, 39)    # NOMRES
+FIELD_OPEN     = (56, 69)    # PREABE   (centavos)
+FIELD_HIGH     = (69, 82)    # PREMAX
+FIELD_LOW      = (82, 95)    # PREMIN
+FIELD_CLOSE    = (108, 121)  # PREULT
+FIELD_TRADES   = (147, 152)  # TOTNEG
+FIELD_QUANTITY = (152, 170)  # QUATOT
+FIELD_VOLUME   = (170, 188)  # VOLTOT   (centavos)
+
+COLUMNS = ("date", "code_id", "open", "high", "low", "close", "volume", "quantity", "trades")
+
+# colunas devolvidas por B3History.get_history
+HISTORY_COLUMNS = ("date", "open", "high", "low", "close", "volume", "quantity", "trades")
+
+SEGMENT_DTYPES = {
+    "date":     "datetime64[D]",
+    "code_id":  np.int32,
+    "open":     np.float64,
+    "high":     np.float64,
+    "low":      np.float64,
+    "close":    np.float64,
+    "volume":   np.float64,
+    "quantity": np.int64,
+    "trades":   np.int32,
+}
+
+
+def _records_view(data: bytes) -> np.ndarray:
+    """Vê os bytes do arquivo como uma matriz (n_registros, RECORD_LEN) sem copiar linha a linha."""
+    eol = b"\r\n" if b"\r\n" in data[:RECORD_LEN + 2] else b"\n"
+    stride = RECORD_LEN + len(eol)
+
+    if len(data) % stride != 0:
+        data = data.rstrip(b"\r\n") + eol
+
+    if len(data) % stride == 0:
+        arr = np.frombuffer(data, dtype=np.uint8).reshape(-1, stride)
+        if np.all(arr[:, RECORD_LEN:] == np.frombuffer(eol, dtype=np.uint8)):
+            return arr[:, :RECORD_LEN]
+
+    # linhas com tamanho irregular: normaliza uma a uma
+    lines = [line.ljust(RECORD_LEN)[:RECORD_LEN] for line in data.splitlines()]
+    return np.frombuffer(b"".join(lines), dtype=np.uint8).reshape(-1, RECORD_LEN)
+
+
+def _field_int(records: np.ndarray, field) -> np.ndarray:
+    start, end = field
+    digits = records[:, start:end].astype(np.int64) - 48
+    digits[(digits < 0) | (digits > 9)] = 0
+
+    weights = 10 ** np.arange(end - start - 1, -1, -1, dtype=np.int64)
+    return digits @ weights
+
+
+def _field_str(records: np.ndarray, field) -> np.ndarray:
+    start, end = field
+    block = np.ascontiguousarray(records[:, start:end])
+    return np.char.strip(block.view(f"S{end - start}").ravel())
+
+
+def _yyyymmdd_to_date(values: np.ndarray) -> np.ndarray:
+    year  = values // 10000
+    month = (values // 100) % 100
+    day   = values % 100
+
+    months = ((year - 1970) * 12 + (month - 1)).astype("datetime64[M]")
+    return months.astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+
+
+def parse_cotahist(data: bytes) -> dict:
+    """
+    Converte um arquivo COTAHIST (bytes) em colunas NumPy numa única passada.
+
+    Retorna {"codes": [CODNEG], "names": [NOMRES], "date": datetime64[D],
+    "code_id": int32 (índice em codes), "open"/"high"/"low"/"close"/"volume": float64,
+    "quantity": int64, "trades": int32}.
+    """
+    records = _records_view(data)
+    records = records[(records[:, 0] == ord("0")) & (records[:, 1] == ord("1"))]
+
+    code_bytes = _field_str(records, FIELD_CODE)
+    codes, first, code_id = np.unique(code_bytes, return_index=True, return_inverse=True)
+    names = _field_str(records[first], FIELD_NAME)
+
+    return {
+        "codes":    [c.decode("latin1") for c in codes],
+        "names":    [n.decode("latin1") for n in names],
+        "date":     _yyyymmdd_to_date(_field_int(records, FIELD_DATE)),
+        "code_id":  code_id.astype(np.int32),
+        "open":     _field_int(records, FIELD_OPEN) / 100.0,
+        "high":     _field_int(records, FIELD_HIGH) / 100.0,
+        "low":      _field_int(records, FIELD_LOW) / 100.0,
+        "close":    _field_int(records, FIELD_CLOSE) / 100.0,
+        "volume":   _field_int(records, FIELD_VOLUME) / 100.0,
+        "quantity": _field_int(records, FIELD_QUANTITY),
+        "trades":   _field_int(records, FIELD_TRADES).astype(np.int32),
+    }
+
+
+def sort_by_ticker(parsed: dict) -> dict:
+    """Ordena os registros por (ticker, data) e calcula offsets por ticker."""
+    order = np.lexsort((parsed["date"], parsed["code_id"]))
+
+    for column in COLUMNS:
+        parsed[column] = parsed[column][order]
+
+    # linhas do ticker k: offsets[k] .. offsets[k+1]
+    parsed["offsets"] = np.searchsorted(
+        parsed["code_id"], np.arange(len(parsed["codes"]) + 1)
+    ).astype(np.int64)
+
+    return parsed
+
+
+def merge_parsed(parts: list) -> dict:
+    """Junta vários resultados de parse_cotahist num dicionário de tickers comum."""
+    codes = sorted(set(code for part in parts for code in part["codes"]))
+    position = {code: k for k, code in enumerate(codes)}
+
+    names = [""] * len(codes)
+    merged = {column: [] for column in COLUMNS}
+
+    for part in parts:
+        remap = np.array([position[code] for code in part["codes"]], dtype=np.int32)
+
+        for code, name in zip(part["codes"], part["names"]):
+            names[position[code]] = name
+
+        for column in COLUMNS:
+            if column == "code_id":
+                merged[column].append(remap[part["code_id"]])
+            else:
+                merged[column].append(part[column])
+
+    result = {"codes": codes, "names": names}
+    for column in COLUMNS:
+        if merged[column]:
+            result[column] = np.concatenate(merged[column])
+        else:
+            result[column] = np.array([], dtype=SEGMENT_DTYPES[column])
+
+    return result
+
+
+# ==========================
+# CACHE BINÁRIO COLUNAR (1 pasta por ano)
+# ==========================
+def save_year_cache(path: str, parsed: dict, meta=None):
+    """Grava um .npy por coluna + tickers.json (+ meta.json); a pasta só aparece completa."""
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    for column in COLUMNS + ("offsets",):
+        np.save(os.path.join(tmp_path, column + ".npy"), parsed[column])
+
+    with open(os.path.join(tmp_path, "tickers.json"), "w", encoding="utf-8") as f:
+        json.dump({"codes": parsed["codes"], "names": parsed["names"]}, f)
+
+    if meta is not None:
+        save_year_meta(tmp_path, meta)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+
+def load_year_cache(path: str) -> dict:
+    """Abre as colunas com mmap: só as páginas efetivamente lidas vão para a memória."""
+    with open(os.path.join(path, "tickers.json"), "r", encoding="utf-8") as f:
+        year = json.load(f)
+
+    for column in COLUMNS + ("offsets",):
+        year[column] = np.load(os.path.join(path, column + ".npy"), mmap_mode="r")
+
+    year["code_index"] = {code: k for k, code in enumerate(year["codes"])}
+    year["meta"] = load_year_meta(path)
+
+    return year
+
+
+def save_year_meta(path: str, meta: dict):
+    """meta.json: Last-Modified do arquivo anual e hora da última verificação."""
+    tmp_file = os.path.join(path, "meta.json.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_file, os.path.join(path, "meta.json"))
+
+
+def load_year_meta(path: str) -> dict:
+    try:
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# ==========================
+# DOWNLOAD / LEITURA EM STREAMING
+# ==========================
+URL_ANNUAL = "https://bvmf.bmfbovespa.com.br/InstDados/SerHist/COTAHIST_A{year}.ZIP"
+URL_DAILY  = "https://bvmf.bmfbovespa.com.br/InstDados/SerHist/COTAHIST_D{day:%d%m%Y}.ZIP"
+
+CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def download_file(url: str, path: str, func_progress=None, chunk_size=1024 * 1024, headers=None):
+    """
+    Baixa em blocos direto para o disco; func_progress(bytes_lidos, bytes_totais).
+    Retorna os headers da resposta, ou None se o servidor respondeu 304 (Not Modified).
+    """
+    part_path = path + ".part"
+
+    with requests.get(url, stream=True, timeout=60, headers=headers) as r:
+        if r.status_code == 304:
+            return None
+        r.raise_for_status()
+        total = int(r.headers.get("Content-Length", 0))
+        done = 0
+
+        with open(part_path, "wb") as f:
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                done += len(chunk)
+
+                if func_progress is not None:
+                    func_progress(done, total)
+
+        response_headers = dict(r.headers)
+
+    os.replace(part_path, path)
+    return response_headers
+
+
+def iter_cotahist_file(f, total=0, func_progress=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Lê um COTAHIST já aberto (modo binário) em blocos de linhas inteiras
+    e gera o parse_cotahist de cada bloco; func_progress(bytes_lidos, total).
+    """
+    carry = b""
+    done = 0
+
+    while True:
+        block = f.read(chunk_bytes)
+        if not block:
+            break
+
+        done += len(block)
+        block = carry + block
+
+        # só linhas completas; o resto vai para o próximo bloco
+        cut = block.rfind(b"\n") + 1
+        carry = block[cut:]
+
+        if cut > 0:
+            yield parse_cotahist(block[:cut])
+
+        if func_progress is not None:
+            func_progress(done, total)
+
+    if carry.strip():
+        yield parse_cotahist(carry)
+
+
+def iter_cotahist_zip(zip_path: str, func_progress=None):
+    """Descompacta o membro do ZIP incrementalmente, sem carregá-lo inteiro."""
+    with zipfile.ZipFile(zip_path) as z:
+        info = z.infolist()[0]
+        with z.open(info) as f:
+            yield from iter_cotahist_file(f, info.file_size, func_progress)
+
+
+def build_year_cache(year: int, cache_dir: str, func_progress=None, headers=None) -> str:
+    """
+    Gera o cache binário do ano (download + parse em streaming) se ainda não existir.
+    func_progress(fração 0..1): metade download, metade leitura.
+
+    Com headers (ex.: If-Modified-Since) o ano é baixado de novo mesmo se já existir;
+    se o servidor responder 304 o cache atual é mantido.
+    """
+    cache_path = os.path.join(cache_dir, f"COTAHIST_{year}")
+    if headers is None and os.path.exists(os.path.join(cache_path, "tickers.json")):
+        return cache_path
+
+    def stage(offset):
+        if func_progress is None:
+            return None
+        return lambda done, total: func_progress(offset + 0.5 * done / total if total else offset)
+
+    legacy_file = os.path.join(cache_dir, f"COTAHIST_{year}.txt")
+    zip_file = os.path.join(cache_dir, f"COTAHIST_A{year}.ZIP")
+
+    meta = {"checked_at": time.time()}
+
+    if headers is None and os.path.exists(legacy_file):
+        # cache texto de versões anteriores
+        with open(legacy_file, "rb") as f:
+            parts = list(iter_cotahist_file(f, os.path.getsize(legacy_file), stage(0.5)))
+    else:
+        print(f"Baixando COTAHIST {year}...")
+        response_headers = download_file(URL_ANNUAL.format(year=year), zip_file, stage(0.0), headers=headers)
+
+        if response_headers is None:
+            print(f"COTAHIST {year} sem alterações")
+            save_year_meta(cache_path, dict(load_year_meta(cache_path), **meta))
+            return cache_path
+
+        meta["last_modified"] = response_headers.get("Last-Modified")
+        parts = list(iter_cotahist_zip(zip_file, stage(0.5)))
+
+    save_year_cache(cache_path, sort_by_ticker(merge_parsed(parts)), meta)
+
+    for path in (legacy_file, zip_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+    return cache_path
+
+
+def _build_year_cache_worker(year: int, cache_dir: str, queue) -> str:
+    """Executado num processo do pool; manda (ano, fração) pela fila do Manager."""
+    last = [0.0]
+
+    def func_progress(frac):
+        if frac - last[0] >= 0.01 or frac >= 1.0:
+            last[0] = frac
+            queue.put((year, frac))
+
+    return build_year_cache(year, cache_dir, func_progress)
+
+
+# ==========================
+# ATUALIZAÇÃO DOS ANOS ABERTOS
+# ==========================
+# intervalo mínimo entre verificações do ano aberto
+REFRESH_INTERVAL = 3600
+
+# acima disso de pregões faltando, compensa baixar o arquivo anual de novo
+MAX_DAILY_FILES = 10
+
+# dias após 31/12 em que o ano ainda é verificado (os últimos pregões saem depois)
+YEAR_CLOSE_DAYS = 7
+
+
+def year_is_closed(year: int, cache_path: str) -> bool:
+    """
+    True se o cache do ano foi verificado depois do fim do ano (+ YEAR_CLOSE_DAYS):
+    não recebe mais pregões. Um ano gravado enquanto ainda estava aberto
+    (ex.: 2025 em outubro/2025) continua sendo atualizado até fechar.
+    """
+    checked_at = load_year_meta(cache_path).get("checked_at", 0)
+    closed_at = datetime(year + 1, 1, 1) + timedelta(days=YEAR_CLOSE_DAYS)
+    return datetime.fromtimestamp(checked_at) >= closed_at
+
+
+def refresh_year_cache(year: int, cache_dir: str, func_progress=None) -> bool:
+    """
+    Acrescenta ao cache do ano (já existente) os pregões novos.
+
+    Poucos pregões faltando: baixa os arquivos diários COTAHIST_Dddmmaaaa
+    (404 = feriado ou ainda não publicado). Muitos: baixa o anual de novo,
+    só se mudou desde o último download (If-Modified-Since).
+    Retorna True se o cache foi reescrito.
+    """
+    cache_path = os.path.join(cache_dir, f"COTAHIST_{year}")
+    meta = load_year_meta(cache_path)
+    now = time.time()
+
+    if now - meta.get("checked_at", 0) < REFRESH_INTERVAL:
+        return False
+
+    cache = load_year_cache(cache_path)
+    if len(cache["date"]):
+        last_date = cache["date"].max()
+    else:
+        last_date = np.datetime64(f"{year - 1}-12-31")
+
+    today = np.datetime64(datetime.today().date())
+    days = np.arange(last_date + 1, min(today, np.datetime64(f"{year}-12-31")) + 1)
+    days = days[np.is_busday(days)]
+
+    meta["checked_at"] = now
+
+    if len(days) == 0:
+        save_year_meta(cache_path, meta)
+        return False
+
+    if len(days) > MAX_DAILY_FILES:
+        del cache  # libera os mmaps antes de substituir a pasta
+        headers = {}
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        before = meta.get("last_modified")
+        build_year_cache(year, cache_dir, func_progress, headers=headers)
+        return load_year_meta(cache_path).get("last_modified") != before
+
+    parts = []
+    for k, day in enumerate(days.tolist()):
+        zip_file = os.path.join(cache_dir, f"COTAHIST_D{day:%d%m%Y}.ZIP")
+
+        try:
+            download_file(URL_DAILY.format(day=day), zip_file)
+            parts.extend(iter_cotahist_zip(zip_file))
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+        finally:
+            if os.path.exists(zip_file):
+                os.remove(zip_file)
+
+        if func_progress is not None:
+            func_progress((k + 1) / len(days))
+
+    # só datas posteriores ao cache (evita duplicar um pregão)
+    parts = [_filter_rows(part, part["date"] > last_date) for part in parts]
+    parts = [part for part in parts if len(part["date"])]
+
+    if not parts:
+        save_year_meta(cache_path, meta)
+        return False
+
+    print(f"COTAHIST {year}: +{sum(len(part['date']) for part in parts)} registros")
+    merged = sort_by_ticker(merge_parsed([cache] + parts))
+    del cache
+
+    save_year_cache(cache_path, merged, meta)
+    return True
+
+
+def _filter_rows(parsed: dict, mask: np.ndarray) -> dict:
+    result = {"codes": parsed["codes"], "names": parsed["names"]}
+    for column in COLUMNS:
+        result[column] = parsed[column][mask]
+    return result
+
+
 class B3History:
     def __init__(self, years_back=2, cache_dir="b3_cache", func_progress100=None):
         self.years_back = years_back
@@ -25,107 +474,198 @@ class B3History:
         # anos necessários (ex: jan/2026 → 2024, 2025, 2026)
         self.years = list(range(self.start_date.year, self.end_date.year + 1))
 
-        # dataset global carregado UMA VEZ
-        self.raw_data = self._load_all_years()
+        # um segmento por ano: colunas NumPy mapeadas do cache binário,
+        # ordenadas por (ticker, data), com offsets por ticker
+        self.segments = self._load_all_years()
 
     # ==========================
     # DOWNLOAD GLOBAL (1x)
     # ==========================
-    def _download_year_raw(self, year: int) -> list[str]:
-        cache_file = os.path.join(self.cache_dir, f"COTAHIST_{year}.txt")
-
-        # cache local bruto
-        if os.path.exists(cache_file):
-            with open(cache_file, "r", encoding="latin1") as f:
-                return f.read().splitlines()
+    def _report(self, value: float):
+        if self.func_progress100 is not None:
+            self.func_progress100(value)
+            QApplication.processEvents()
 
-        print(f"Baixando COTAHIST {year}...")
+    def _load_all_years(self) -> list[dict]:
+        K = len(self.years)
 
-        url = f"https://bvmf.bmfbovespa.com.br/InstDados/SerHist/COTAHIST_A{year}.ZIP"
-        r = requests.get(url)
-        r.raise_for_status()
-        QApplication.processEvents()
+        missing = [
+            year for year in self.years
+            if not os.path.exists(os.path.join(self.cache_dir, f"COTAHIST_{year}", "tickers.json"))
+        ]
+
+        if len(missing) == 1:
+            k = self.years.index(missing[0])
+            build_year_cache(
+                missing[0],
+                self.cache_dir,
+                func_progress=lambda frac: self._report((k + frac) * 100.0 / K)
+            )
+        elif len(missing) > 1:
+            self._build_years_parallel(missing)
+
+        # anos gravados ainda abertos (o corrente, ou um anterior salvo antes
+        # de terminar) continuam recebendo pregões
+        for year in self.years:
+            cache_path = os.path.join(self.cache_dir, f"COTAHIST_{year}")
+            if year in missing or year_is_closed(year, cache_path):
+                continue
 
-        with zipfile.ZipFile(io.BytesIO(r.content)) as z:
-            file_name = z.namelist()[0]
-            with z.open(file_name) as f:
-                raw = f.read().decode("latin1").splitlines()
+            try:
+                refresh_year_cache(year, self.cache_dir)
+            except Exception as e:
+                print(f"Erro ao atualizar COTAHIST {year}: {e}")
 
-        QApplication.processEvents()
-        
-        # salva cache
-        with open(cache_file, "w", encoding="latin1") as f:
-            f.write("\n".join(raw))
+        self._report(100.0)
 
-        QApplication.processEvents()
-        
-        return raw
+        return [
+            load_year_cache(os.path.join(self.cache_dir, f"COTAHIST_{year}"))
+            for year in self.years
+        ]
 
-    def _load_all_years(self) -> list[str]:
-        all_lines = []
+    def _build_years_parallel(self, years: list[int]):
+        """Baixa e converte vários anos em processos separados."""
         K = len(self.years)
+        progress = {year: 0.0 for year in self.years}
+        for year in self.years:
+            if year not in years:
+                progress[year] = 1.0
 
-        for k, year in enumerate(self.years):
-            all_lines.extend(self._download_year_raw(year))
+        # "spawn": seguro mesmo chamado de uma thread com Qt ativo
+        ctx = multiprocessing.get_context("spawn")
+        workers = min(len(years), os.cpu_count() or 1)
 
-            if self.func_progress100 is not None:
-                self.func_progress100((k + 1) * 100.0 / K)
-                QApplication.processEvents()
-            
-        return all_lines
+        with ctx.Manager() as manager:
+            queue = manager.Queue()
 
-    # ==========================
-    # CONSULTA (SEM DOWNLOAD)
-    # ==========================
-    def get_prices(self, ticker: str, months: int = 24) -> list[float]:
-        ticker = remove_sa_suffix(ticker.upper().strip())
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as executor:
+                pending = {
+                    executor.submit(_build_year_cache_worker, year, self.cache_dir, queue): year
+                    for year in years
+                }
+
+                while pending:
+                    done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
 
-        end_date = self.end_date
-        start_date = end_date - timedelta(days=int(30.41 * months)) # months of 30.41 days
+                    for future in done:
+                        year = pending.pop(future)
+                        future.result()  # propaga erro de download/parse
+                        progress[year] = 1.0
 
-        all_data = []
-        K = len(self.raw_data)
+                    while not queue.empty():
+                        year, frac = queue.get_nowait()
+                        progress[year] = max(progress[year], frac)
 
-        if K == 0:
-            return []
+                    self._report(sum(progress.values()) * 100.0 / K)
 
-        STEPS = max(1, K // 100)
-        
-        for k, line in enumerate(self.raw_data):
-            if not line.startswith("01"):
+    # ==========================
+    # ÍNDICE POR TICKER
+    # ==========================
+    def _gather(self, ticker: str, columns, start_date=None, end_date=None) -> dict:
+        """
+        Junta as linhas do ticker de todos os anos (anos em ordem → datas em ordem).
+        O intervalo [start_date, end_date] é recortado por busca binária nas datas
+        do ticker em cada ano, sem comparar registro a registro.
+        """
+        parts = {column: [] for column in columns}
+
+        for segment in self.segments:
+            k = segment["code_index"].get(ticker)
+            if k is None:
                 continue
 
-            try:
-                code = line[12:24].strip()
-                date = datetime.strptime(line[2:10], "%Y%m%d")
-                close_price = int(line[108:121]) / 100
-            except:
+            lo = int(segment["offsets"][k])
+            hi = int(segment["offsets"][k + 1])
+            dates = segment["date"][lo:hi]
+
+            first = 0 if start_date is None else int(np.searchsorted(dates, start_date, side="left"))
+            last = len(dates) if end_date is None else int(np.searchsorted(dates, end_date, side="right"))
+            if first >= last:
                 continue
 
-            if code == ticker and start_date <= date <= end_date:
-                all_data.append((date, close_price))
+            rows = slice(lo + first, lo + last)
+            for column in columns:
+                parts[column].append(segment[column][rows])
+
+        return {
+            column: np.concatenate(arrays) if arrays else np.array([], dtype=SEGMENT_DTYPES[column])
+            for column, arrays in parts.items()
+        }
 
-            if self.func_progress100 is not None and k % STEPS == 0:
-                self.func_progress100((k + 1) * 100.0 / K)
+    # ==========================
+    # CONSULTA (SEM DOWNLOAD)
+    # ==========================
+    def _window(self, months: int = 24, start=None, end=None):
+        """(start_date, end_date) em datetime64[D]; start/end explícitos têm prioridade."""
+        end_date = np.datetime64(end if end is not None else self.end_date.date(), "D")
+        if start is not None:
+            start_date = np.datetime64(start, "D")
+        else:
+            start_date = end_date - np.timedelta64(int(30.41 * months), "D") # months of 30.41 days
+        return start_date, end_date
+
+    def get_history(self, ticker: str, months: int = 24, start=None, end=None, columns=HISTORY_COLUMNS) -> dict:
+        """
+        Pregões do ticker no período, em arrays NumPy tipados e ordenados por data:
+        {"date": datetime64[D], "open"/"high"/"low"/"close"/"volume": float64,
+        "quantity": int64, "trades": int32}.
+
+        start/end aceitam "AAAA-MM-DD", date ou datetime64; sem start, usa months até end.
+        """
+        ticker = remove_sa_suffix(ticker.upper().strip())
+        start_date, end_date = self._window(months, start, end)
 
-        all_data.sort(key=lambda x: x[0])
+        history = self._gather(ticker, columns, start_date, end_date)
 
         if self.func_progress100 is not None:
             self.func_progress100(100.0)
-        
-        return [price for _, price in all_data]
+
+        return history
+
+    def get_prices(self, ticker: str, months: int = 24) -> list[float]:
+        return self.get_history(ticker, months, columns=("close",))["close"].tolist()
+
+    def get_prices_many(self, tickers, months: int = 24):
+        """
+        Fechamentos de vários tickers alinhados por data.
+
+        Retorna (dates, prices): dates é datetime64[D] ordenado (união dos pregões)
+        e prices é uma matriz float64 len(dates) x len(tickers), na ordem de tickers,
+        com NaN onde o ticker não negociou.
+        """
+        codes = [remove_sa_suffix(ticker.upper().strip()) for ticker in tickers]
+        start_date, end_date = self._window(months)
+
+        # uma fatia por (ano, ticker) direto dos offsets, sem varrer os registros
+        rows = []
+        for code in codes:
+            data = self._gather(code, ("date", "close"), start_date, end_date)
+            rows.append((data["date"], data["close"]))
+
+        if rows:
+            dates = np.unique(np.concatenate([d for d, _ in rows]))
+        else:
+            dates = np.array([], dtype=SEGMENT_DTYPES["date"])
+
+        prices = np.full((len(dates), len(codes)), np.nan)
+        for j, (d, close) in enumerate(rows):
+            prices[np.searchsorted(dates, d), j] = close
+
+        if self.func_progress100 is not None:
+            self.func_progress100(100.0)
+
+        return dates, prices
 
 if __name__ == "__main__":
     def progress(val):
         print(val)
 
-    b3 = B3History(years_back=2, cache_dir="b3_cache", func_progress100=progress) 
+    b3 = B3History(years_back=2, cache_dir="b3_cache", func_progress100=progress)
 
     ticker = remove_sa_suffix("BSOX39.SA")
 
-    prices = b3.get_prices(ticker, months=24) 
+    prices = b3.get_prices(ticker, months=24)
 
     print(ticker)
     print(len(prices))
     print(prices)
-
@@ -0,0 +1,208 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QColor
+
+from stock_viewer.modules.columns import get_column, day_data_color_and_percent
+
+# lista de preços de uma coluna de mini-gráfico (desenhada pelo SparklineDelegate)
+SPARKLINE_ROLE = Qt.UserRole + 1
+
+# (ticker, coluna, versão dos dados, cor): chave do cache de imagens dos mini-gráficos
+SPARKLINE_KEY_ROLE = Qt.UserRole + 2
+
+# valor bruto para ordenar (float ou texto), usado pelo QSortFilterProxyModel
+SORT_ROLE = Qt.UserRole + 3
+
+ALIGN_RIGHT = int(Qt.AlignRight | Qt.AlignVCenter)
+
+
+class StocksTableModel(QAbstractTableModel):
+    """
+    Modelo da tabela de ações: lê direto de stocks_data, uma linha por ticker
+    do grupo exibido. As células são formatadas sob demanda em data(), pela
+    Column de cada chave (columns.py), resolvida uma vez em set_columns().
+    """
+    stock_edited = pyqtSignal(str)   # quantidade ou preço médio editados na tabela
+
+    def __init__(self, config, parent=None):
+        super().__init__(parent)
+        self.config = config
+
+        # cores criadas uma vez (não a cada célula)
+        self.colors = {
+            "green_color": QColor(config["green_color"]),
+            "red_color":   QColor(config["red_color"]),
+            "lightgray":   QColor("lightgray"),
+        }
+
+        self.column_keys = []
+        self.columns = []
+        self.column_titles = []
+        self.column_tooltips = []
+
+        self.stocks_data = {}
+        self.stocks = []
+        self.rows = {}   # ticker -> linha
+
+        # versão dos dados de cada ticker; muda só quando chegam dados novos
+        self.generation = 0
+        self.versions = {}
+
+        # (ticker, coluna) -> valor de ordenação, calculado uma vez
+        self.sort_values = {}
+
+    # ---------------- estrutura ---------------- #
+
+    def set_columns(self, keys, titles, tooltips):
+        self.beginResetModel()
+        self.column_keys = list(keys)
+        self.columns = [get_column(key) for key in self.column_keys]
+        self.column_titles = list(titles)
+        self.column_tooltips = list(tooltips)
+        self.sort_values = {}
+        self.endResetModel()
+
+    def set_stocks(self, stocks_data, stocks):
+        self.beginResetModel()
+        if stocks_data is not self.stocks_data:
+            # outro arquivo: nenhuma versão anterior vale
+            self.generation += 1
+            self.versions = {}
+        self.stocks_data = stocks_data
+        self.sort_values = {}
+        self.stocks = list(stocks)
+        self.rows = {stock: row for row, stock in enumerate(self.stocks)}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.stocks)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.column_keys)
+
+    def stock_at(self, row):
+        if 0 <= row < len(self.stocks):
+            return self.stocks[row]
+        return ""
+
+    def row_of(self, stock):
+        return self.rows.get(stock, -1)
+
+    def column_of(self, key):
+        try:
+            return self.column_keys.index(key)
+        except ValueError:
+            return -1
+
+    def version(self, stock):
+        return (self.generation, self.versions.get(stock, 0))
+
+    def update_stock(self, stock, data_changed=True):
+        """
+        Avisa a view que só a linha do ticker mudou.
+        data_changed=False quando só quantidade/preço médio mudaram (mini-gráficos iguais).
+        """
+        if data_changed:
+            self.versions[stock] = self.versions.get(stock, 0) + 1
+
+        for column in self.column_keys:
+            self.sort_values.pop((stock, column), None)
+
+        row = self.row_of(stock)
+        if row < 0 or not self.column_keys:
+            return
+
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.column_keys) - 1))
+
+    # ---------------- células ---------------- #
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation != Qt.Horizontal or not 0 <= section < len(self.column_keys):
+            return super().headerData(section, orientation, role)
+
+        if role == Qt.DisplayRole:
+            return self.column_titles[section]
+        if role == Qt.ToolTipRole:
+            return self.column_tooltips[section]
+
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+
+        flags = Qt.ItemIsSelectable | Qt.ItemIsEnabled
+        if self.columns[index.column()].editable:
+            flags |= Qt.ItemIsEditable
+
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        column = self.columns[index.column()]
+        stock = self.stocks[index.row()]
+        stock_data = self.stocks_data.get(stock, {})
+
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return column.text(stock, stock_data)
+
+        if role == Qt.TextAlignmentRole:
+            if column.numeric and not column.sparkline:
+                return ALIGN_RIGHT
+            return None
+
+        if role == Qt.BackgroundRole:
+            return self.cell_background(column, stock_data)
+
+        if role == SORT_ROLE:
+            key = (stock, column.key)
+            value = self.sort_values.get(key)
+            if value is None:
+                value = column.sort_value(stock, stock_data)
+                self.sort_values[key] = value
+            return value
+
+        if not column.sparkline:
+            return None
+
+        if role == SPARKLINE_ROLE:
+            return column.getter(stock, stock_data)
+
+        if role == SPARKLINE_KEY_ROLE:
+            color, _ = day_data_color_and_percent(column.getter(stock, stock_data))
+            return (stock, column.key, self.version(stock), color)
+
+        return None
+
+    def cell_background(self, column, stock_data):
+        color_key = column.color_key(stock_data)
+        if color_key is not None:
+            return self.colors[color_key]
+
+        if not column.editable:
+            return self.colors["lightgray"]
+
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid():
+            return False
+
+        column = self.columns[index.column()]
+        if not column.editable:
+            return False
+
+        stock = self.stocks[index.row()]
+
+        try:
+            value = column.parse(value)
+        except (TypeError, ValueError):
+            value = 0
+
+        self.stocks_data[stock][column.key] = value
+
+        self.stock_edited.emit(stock)
+        self.update_stock(stock, data_changed=False)
+
+        return True
@@ -6,19 +6,23 @@ import json
 import signal
 
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QVBoxLayout, QLabel, QComboBox, QTableWidget, QProgressBar, 
-    QTableWidgetItem, QWidget, QPushButton, QLineEdit, QFileDialog, QHBoxLayout, 
-    QTabWidget, QFormLayout, QSplitter, QMenu, QSizePolicy
+    QApplication, QMainWindow, QVBoxLayout, QLabel, QComboBox, QTableView, QProgressBar, 
+    QWidget, QPushButton, QLineEdit, QFileDialog, QHBoxLayout, 
+    QTabWidget, QFormLayout, QSplitter, QMenu, QSizePolicy, QMessageBox
 )
 
-from PyQt5.QtGui  import QColor, QIcon, QFont, QDesktopServices
-from PyQt5.QtCore import Qt, QUrl, QSize, QTimer
+from PyQt5.QtGui  import QIcon, QFont, QDesktopServices
+from PyQt5.QtCore import Qt, QUrl, QSize, QTimer, QSortFilterProxyModel
 
 import pyqtgraph as pg
 import numpy as np
-import math
 
-from stock_viewer.modules.stock       import agregate_more_stock_info
+from stock_viewer.modules.refresh     import RefreshWorker, start_refresh_thread
+from stock_viewer.modules.stock       import fields_for_columns, update_amounts, HISTORY_STORE
+from stock_viewer.modules.providers   import providers_from_config
+from stock_viewer.modules.add_ticker  import AddTickerDialog, SymbolIndex, b3_symbols, b3_symbols_version
+from stock_viewer.modules.table_model import StocksTableModel, SORT_ROLE
+from stock_viewer.modules.sparkline   import SparklineDelegate
 from stock_viewer.modules.text_editor import open_with_default_text_editor
 from stock_viewer.modules.categorize  import categorize_stocks
 from stock_viewer.modules.wabout      import show_about_window
@@ -95,7 +99,19 @@ DEFAULT_PROGRAM_CONTENT={
     "stocks_button": "Select *.stocks.json",
     "stocks_button_tooltip": "Click to select the *.stocks.json file",
     "update_button": "To update",
-    "update_button_tooltip": "Click to update data for selected files",
+    "update_button_tooltip": "Click to update data for selected files (Shift+click ignores the local cache)",
+    "cancel_button": "Cancel",
+    "cancel_button_tooltip": "Stop the data update in progress",
+    "refresh_stats_tooltip": "Last update: {remote} remote calls, {disk} from disk cache, {saved} saved by snapshot",
+    "add_ticker_button": "Add",
+    "add_ticker_button_tooltip": "Add a ticker to the portfolio (remember to save)",
+    "add_ticker_title": "Add ticker",
+    "add_ticker_symbol": "Ticker:",
+    "add_ticker_symbol_tooltip": "Type the code or the company name",
+    "add_ticker_quantity": "Quantity:",
+    "add_ticker_average_price": "Average price:",
+    "add_ticker_group": "Group:",
+    "add_ticker_exists": "The ticker is already in the portfolio",
     "select_group": "Select a group:",
     "select_group_tooltip": "Choose a stock group to view its details",
     "table_tooltip": "Table displaying the shares, average prices, quantities and total amounts of the selected group",
@@ -125,13 +141,18 @@ DEFAULT_PROGRAM_CONTENT={
     "plot_pccolor": "red", 
     "plot_xlabel": "Working days",
     "plot_ylabel": "Price",
-    "plot_ylabel2": "Variation"
+    "plot_ylabel2": "Variation",
+    "price_providers": {
+        "*": ["yahoo", "offline"]
+    },
+    "b3_years_back": 2,
+    "b3_cache_dir": ""
 }
 
 configure.verify_default_config(DEFAULT_TABLE_CONFIG_PATH, default_content=DEFAULT_TABLE_CONTENT)
 configure.verify_default_config(PROGRAM_CONFIG_PATH      , default_content=DEFAULT_PROGRAM_CONTENT)
 
-CONFIG=configure.load_config(PROGRAM_CONFIG_PATH)
+CONFIG=configure.load_config(PROGRAM_CONFIG_PATH, default_content=DEFAULT_PROGRAM_CONTENT)
 
 def show_bar_plot_hor(labels, values, title="", color = "blue"):
     w = pg.plot()
@@ -221,20 +242,6 @@ def show_bar_plot_hor(labels, values, title="", color = "blue"):
 
 
 
-def plot_1d_simple_widget(prices,color="red", width=1):
-    w = pg.PlotWidget()
-    time=list(range(len(prices)));
-    w.plot(
-        time, 
-        prices,
-        pen=pg.mkPen(color=color, width=width)
-    )
-    
-    w.hideAxis('bottom')
-    w.hideAxis('left')
-    
-    return w
-
 class PercentAxis(pg.AxisItem):
     def __init__(self, average_price, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -382,18 +389,6 @@ def plot_1d_complex(
 
 
 
-def day_data_color_and_percent(prices, green_color="green", red_color="red"):
-    if len(prices)==0:
-        return "white", 0.0
-
-    percent = (prices[-1] - prices[0])*100.0/prices[0]
-
-    if prices[0]<prices[-1]:
-        return green_color, percent
-
-    return red_color, percent
-
-
 def dicts_to_keys_titles(lista):
     list_keys=[];
     list_titles=[];
@@ -404,44 +399,6 @@ def dicts_to_keys_titles(lista):
         list_tooltips.append(d['tooltip'])
     return list_keys,list_titles,list_tooltips
 
-# Subclassificando QTableWidgetItem para suportar ordenação numérica, incluindo NaN
-class NumericTableWidgetItem(QTableWidgetItem):
-    def __init__(self, text):
-        super().__init__(text)  # Chama o construtor da classe base
-        # Tenta converter o texto em número para definir o alinhamento
-        try:
-            float_value = float(text)
-            # Se for um número, justifica à direita
-            self.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        except ValueError:
-            # Se não for um número, mantém o alinhamento padrão
-            pass
-
-    def __lt__(self, other):
-        # Tenta converter os itens em números float
-        try:
-            value1 = float(self.text())
-        except ValueError:
-            return super().__lt__(other)  # Se não for número, compara como string
-        
-        try:
-            value2 = float(other.text())
-        except ValueError:
-            return super().__lt__(other)  # Se não for número, compara como string
-
-        # Verifica se algum valor é NaN e define a lógica de ordenação
-        if math.isnan(value1):
-            return False  # Coloca NaN no final
-        if math.isnan(value2):
-            return True  # Coloca NaN no final
-
-        # Compara numericamente se ambos os valores são válidos
-        return value1 < value2
-
-        
-################################################################################
-################################################################################
-################################################################################
 class StocksViewer(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -454,6 +411,21 @@ class StocksViewer(QMainWindow):
         
         self.plot_windows = []  # manter referência às janelas abertas
 
+        # atualização em segundo plano (QThread)
+        self.refresh_worker = None
+        self.refresh_thread = None
+        self.fetched_fields = {}     # ticker -> campos remotos já presentes em stocks_data
+        self.refresh_fields = set()  # campos da atualização em andamento
+        self.refresh_failed = False
+        self.refresh_stats = {}      # contadores da última atualização (TickerSnapshot)
+
+        # origem do histórico por sufixo (Yahoo, COTAHIST da B3, cache offline)
+        self.price_providers = providers_from_config(CONFIG)
+
+        # índice do autocompletar do "Add" (ver symbol_index)
+        self.symbols = None
+        self.symbols_b3_version = None
+
         ## Icon
         # Get base directory for icons
         self.icon_path = resource_path("icons", "logo.png")
@@ -463,6 +435,7 @@ class StocksViewer(QMainWindow):
         self.config_data=self.load_config_file();
 
         self.column_keys, self.column_titles, self.column_tooltips = dicts_to_keys_titles(self.config_data["columns"])
+        self.table_model.set_columns(self.column_keys, self.column_titles, self.column_tooltips)
 
 
     def initUI(self):
@@ -522,6 +495,15 @@ class StocksViewer(QMainWindow):
         self.update_button.clicked.connect(self.update_data)
         buttons_layout.addWidget(self.update_button)
 
+        # Botão de Cancelar a atualização
+        self.cancel_button = QPushButton(CONFIG["cancel_button"], self)
+        self.cancel_button.setToolTip(CONFIG["cancel_button_tooltip"])
+        self.cancel_button.setIcon(QIcon.fromTheme("process-stop"))
+        self.cancel_button.setIconSize(QSize(CONFIG["toolbutton_icon_size"], CONFIG["toolbutton_icon_size"]))
+        self.cancel_button.clicked.connect(self.cancel_update)
+        self.cancel_button.setEnabled(False)
+        buttons_layout.addWidget(self.cancel_button)
+
         # Botão de Salvar
         self.save_button = QPushButton(CONFIG["button_save"], self)
         self.save_button.setToolTip(CONFIG["button_save_tooltip"])
@@ -530,6 +512,14 @@ class StocksViewer(QMainWindow):
         self.save_button.clicked.connect(self.save_data)
         buttons_layout.addWidget(self.save_button)
 
+        # Botão de Adicionar ticker
+        self.add_ticker_button = QPushButton(CONFIG["add_ticker_button"], self)
+        self.add_ticker_button.setToolTip(CONFIG["add_ticker_button_tooltip"])
+        self.add_ticker_button.setIcon(QIcon.fromTheme("list-add"))
+        self.add_ticker_button.setIconSize(QSize(CONFIG["toolbutton_icon_size"], CONFIG["toolbutton_icon_size"]))
+        self.add_ticker_button.clicked.connect(self.on_add_ticker_click)
+        buttons_layout.addWidget(self.add_ticker_button)
+
         # Adicionar o espaçador
         spacer = QWidget()
         spacer.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
@@ -607,16 +597,30 @@ class StocksViewer(QMainWindow):
         self.splitter = QSplitter(Qt.Vertical)
 
         # Tabela para mostrar os stocks
-        self.tableWidget = QTableWidget()
-        self.tableWidget.setToolTip(CONFIG["table_tooltip"])
-        self.tableWidget.setSortingEnabled(True) # Habilitar a ordenação ao clicar nos títulos das colunas
-        self.tableWidget.itemChanged.connect(self.callback_item_changed)
-        self.tableWidget.currentCellChanged.connect(self.on_current_cell_changed)
-        self.tableWidget.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.tableWidget.customContextMenuRequested.connect(self.on_table_context_menu)
+        # o modelo lê direto de stocks_data; as células são desenhadas sob demanda
+        self.table_model = StocksTableModel(CONFIG, self)
+        self.table_model.stock_edited.connect(self.on_stock_edited)
+
+        # ordenação pelo proxy, comparando os valores brutos (SORT_ROLE);
+        # sem reordenar a cada dataChanged, para as linhas não pularem durante a atualização
+        self.table_proxy = QSortFilterProxyModel(self)
+        self.table_proxy.setSourceModel(self.table_model)
+        self.table_proxy.setSortRole(SORT_ROLE)
+        self.table_proxy.setDynamicSortFilter(False)
+
+        self.tableView = QTableView()
+        self.tableView.setModel(self.table_proxy)
+        self.tableView.setItemDelegate(SparklineDelegate(self.tableView))
+        self.tableView.setToolTip(CONFIG["table_tooltip"])
+        self.tableView.setSortingEnabled(True) # Habilitar a ordenação ao clicar nos títulos das colunas
+        self.tableView.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.tableView.selectionModel().currentChanged.connect(self.on_current_cell_changed)
+        self.tableView.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.tableView.customContextMenuRequested.connect(self.on_table_context_menu)
+        self.tableView.verticalScrollBar().valueChanged.connect(self.update_refresh_priorities)
         
         # tabela
-        self.splitter.addWidget(self.tableWidget)
+        self.splitter.addWidget(self.tableView)
 
         # widget inferior (placeholder do gráfico)
         self.plot_container = QWidget()
@@ -829,34 +833,241 @@ class StocksViewer(QMainWindow):
         return config_data;
            
     def update_data(self):
-        self.setEnabled(False)
-
-        try:
-            stocks_path = self.stocks_path_edit.text()
-            if stocks_path:
-                self.stocks_data = self.load_json(stocks_path)
-                self.groups_data = categorize_stocks(stocks_path)
-                self.stocks_data = agregate_more_stock_info(
-                    self.stocks_data,
-                    progress=self.progress,
-                    parent=self
-                )
+        if self.refresh_worker is not None:
+            return
+
+        stocks_path = self.stocks_path_edit.text()
+        if not stocks_path:
+            return
+
+        # Shift+click: ignora o cache em disco (info, dividendos, demonstrativos)
+        force_refresh = bool(QApplication.keyboardModifiers() & Qt.ShiftModifier)
+
+        self.stocks_data = self.load_json(stocks_path)
+        self.groups_data = categorize_stocks(stocks_path)
 
-                self.populate_groups()
-                self.update_colors_in_table_items()
+        # mostra as linhas já com quantidade e preço médio; o resto chega por ticker
+        self.populate_groups()
 
-        finally:
-            self.setEnabled(True)
-            self.groupplot_button.setEnabled(True)
-            self.performance_button.setEnabled(True)
+        # só busca o que as colunas configuradas precisam
+        self.fetched_fields = {}
+        self.start_refresh(fields_for_columns(self.column_keys), force_refresh=force_refresh)
+
+    def fetch_missing_fields(self):
+        """Busca só os campos das colunas novas que ainda não foram baixados."""
+        if self.refresh_worker is not None or not self.stocks_data:
+            return
+
+        # por ticker: um ticker que falhou não faz os outros baixarem tudo de novo
+        needed = fields_for_columns(self.column_keys)
+        missing = set()
+        stocks = []
+        for stock_name in self.stocks_data:
+            fields = needed - self.fetched_fields.get(stock_name, set())
+            if fields:
+                missing |= fields
+                stocks.append(stock_name)
+
+        if stocks:
+            self.start_refresh(missing, stocks=None if len(stocks) == len(self.stocks_data) else stocks)
+
+    def start_refresh(self, fields, force_refresh=False, stocks=None):
+        """stocks limita a atualização a alguns tickers (ex.: um recém-adicionado)."""
+        # cada ticker só conta como baixado quando o resultado dele chega
+        self.refresh_fields = set(fields)
+        self.refresh_failed = False
+
+        self.set_refreshing(True)
+
+        if stocks is None:
+            stocks_data = self.stocks_data
+        else:
+            stocks_data = {name: self.stocks_data[name] for name in stocks}
+
+        self.refresh_worker = RefreshWorker(
+            stocks_data,
+            force_refresh=force_refresh,
+            fields=fields,
+            providers=self.price_providers
+        )
+        self.refresh_worker.progress.connect(self.on_refresh_progress)
+        self.refresh_worker.result.connect(self.on_refresh_result)
+        self.refresh_worker.error.connect(self.on_refresh_error)
+        self.refresh_worker.stats.connect(self.on_refresh_stats)
+        self.refresh_worker.finished.connect(self.on_refresh_finished)
+
+        self.update_refresh_priorities()
+
+        self.refresh_thread = start_refresh_thread(self.refresh_worker, self)
+
+    def visible_table_stocks(self):
+        n_rows = self.table_model.rowCount()
+        if n_rows == 0:
+            return []
+
+        viewport = self.tableView.viewport()
+        top    = self.tableView.rowAt(0)
+        bottom = self.tableView.rowAt(viewport.height() - 1)
+
+        top    = 0 if top < 0 else top
+        bottom = n_rows - 1 if bottom < 0 else bottom
+
+        return [self.stock_at_view_row(row) for row in range(top, bottom + 1)]
+
+    def stock_at_view_row(self, row):
+        """Ticker da linha exibida (já ordenada pelo proxy)."""
+        source = self.table_proxy.mapToSource(self.table_proxy.index(row, 0))
+        return self.table_model.stock_at(source.row())
+
+    def update_refresh_priorities(self, *args):
+        """Linhas visíveis primeiro, depois o grupo selecionado, depois o resto."""
+        if self.refresh_worker is None:
+            return
+
+        group_name = self.comboBox.currentText()
+
+        self.refresh_worker.prioritize([
+            self.visible_table_stocks(),
+            self.groups_data.get(group_name, [])
+        ])
+
+    def cancel_update(self):
+        if self.refresh_worker is not None:
+            self.cancel_button.setEnabled(False)
+            self.refresh_worker.cancel()
+
+    def symbol_index(self):
+        """
+        Símbolos para autocompletar: COTAHIST em cache + tickers já buscados no Yahoo.
+        O índice fica guardado; só é refeito quando os tickers.json da B3 mudam,
+        o resto entra de forma incremental.
+        """
+        b3 = self.price_providers.providers.get("b3")
+        b3_version = b3_symbols_version(b3.cache_dir) if b3 is not None else ()
+
+        index = self.symbols
+        if index is None or b3_version != self.symbols_b3_version:
+            index = SymbolIndex()
+            if b3 is not None:
+                for symbol, name in b3_symbols(b3.cache_dir):
+                    index.add(symbol, name)
+
+            self.symbols = index
+            self.symbols_b3_version = b3_version
+
+        for symbol in HISTORY_STORE.tickers():
+            index.add(symbol)
+
+        for symbol, data in self.stocks_data.items():
+            index.add(symbol, data.get("longName") if isinstance(data.get("longName"), str) else "")
+
+        # ordena agora para a primeira tecla não pagar o custo
+        index.build()
+        return index
+
+    def on_add_ticker_click(self):
+        if self.refresh_worker is not None or not self.stocks_path_edit.text():
+            return
+
+        group_name = self.comboBox.currentText()
+        dialog = AddTickerDialog(
+            self.symbol_index(),
+            self.groups_data.keys(),
+            group=group_name,
+            config=CONFIG,
+            parent=self
+        )
+        if dialog.exec_() != dialog.Accepted:
+            return
 
+        symbol, quantity, average_price, group = dialog.values()
+
+        if symbol in self.stocks_data:
+            QMessageBox.warning(self, CONFIG["add_ticker_title"], f"{symbol}:\n\n{CONFIG['add_ticker_exists']}")
+            return
+
+        self.stocks_data[symbol] = {"average_price": average_price, "quantity": quantity}
+        self.groups_data.setdefault("*", []).append(symbol)
+
+        if group and group != "*":
+            self.stocks_data[symbol]["category"] = [group]
+            self.groups_data.setdefault(group, []).append(symbol)
+
+        self.stocks_data[symbol] = update_amounts(self.stocks_data[symbol])
+
+        self.populate_groups()
+        self.comboBox.setCurrentText(group or "*")
+
+        self.start_refresh(fields_for_columns(self.column_keys), stocks=[symbol])
+
+    def set_refreshing(self, refreshing):
+        self.add_ticker_button.setEnabled(not refreshing)
+        self.update_button.setEnabled(not refreshing)
+        self.stocks_button.setEnabled(not refreshing)
+        self.save_button.setEnabled(not refreshing)
+        self.cancel_button.setEnabled(refreshing)
+
+    def on_refresh_progress(self, k, total):
+        self.progress.setMaximum(total)
+        self.progress.setValue(k)
+
+    def on_refresh_result(self, stock_name, data):
+        if stock_name not in self.stocks_data:
+            return
+
+        # preserva edições feitas na tabela durante a atualização
+        data["quantity"]      = self.stocks_data[stock_name].get("quantity", data.get("quantity"))
+        data["average_price"] = self.stocks_data[stock_name].get("average_price", data.get("average_price"))
+
+        self.stocks_data[stock_name] = update_amounts(data)
+        self.fetched_fields.setdefault(stock_name, set()).update(self.refresh_fields)
+
+        # nova versão do ticker mesmo fora do grupo exibido (invalida os mini-gráficos)
+        self.update_table_row(stock_name)
+
+        group_name = self.comboBox.currentText()
+        if stock_name in self.groups_data.get(group_name, []):
+            self.recompute_current_group_total()
+
+    def on_refresh_stats(self, stats):
+        self.refresh_stats = stats
+        self.progress.setToolTip(CONFIG["refresh_stats_tooltip"].format(**stats))
+
+    def on_refresh_error(self, stock_name, message):
+        self.refresh_failed = True
+        QMessageBox.critical(self, "Error getting data", f"{stock_name}:\n\n{message}")
+
+    def on_refresh_finished(self, cancelled):
+        self.refresh_worker = None
+        self.refresh_thread = None
+
+        self.set_refreshing(False)
+        self.groupplot_button.setEnabled(True)
+        self.performance_button.setEnabled(True)
+
+        # colunas adicionadas durante a atualização; depois de um erro não
+        # repete sozinho (o ticker que falhou tentaria de novo sem parar)
+        if not cancelled and not self.refresh_failed:
+            self.fetch_missing_fields()
+
+    def closeEvent(self, event):
+        if self.refresh_worker is not None:
+            self.refresh_worker.cancel()
+            self.refresh_thread.quit()
+            self.refresh_thread.wait()
+
+        super().closeEvent(event)
 
     def update_table_columns(self):
         self.config_data=self.load_config_file();
         self.column_keys, self.column_titles, self.column_tooltips = dicts_to_keys_titles(self.config_data["columns"])
+        self.table_model.set_columns(self.column_keys, self.column_titles, self.column_tooltips)
         
         self.display_table(self.comboBox.currentText())
 
+        # colunas novas: busca sob demanda só os campos que faltam
+        self.fetch_missing_fields()
+
     def load_json(self, filename):
         with open(filename, 'r') as file:
             return json.load(file)
@@ -904,8 +1115,16 @@ class StocksViewer(QMainWindow):
             json.dump(dict_to_save, file, indent=4)
 
     def populate_groups(self):
+        current_group = self.comboBox.currentText()
+
+        self.comboBox.blockSignals(True)
         self.comboBox.clear()
         self.comboBox.addItems(sorted(self.groups_data.keys()))
+
+        if current_group in self.groups_data:
+            self.comboBox.setCurrentText(current_group)
+        self.comboBox.blockSignals(False)
+
         self.display_table(self.comboBox.currentText())
 
     def update_total_label(self, total_group_amount, total_group_gain):
@@ -919,226 +1138,28 @@ class StocksViewer(QMainWindow):
         if not group_name or group_name not in self.groups_data:
             return
 
-        self.tableWidget.blockSignals(True)
-        self.tableWidget.setSortingEnabled(False)
-        
-        try: 
-            group_stocks = self.groups_data[group_name]
-            total_group_amount = 0
-            total_group_gain = 0
-
-            # Configuração de colunas
-            self.tableWidget.clear()  # Limpa os dados da tabela
-            self.tableWidget.setColumnCount(len(self.column_titles))
-            self.tableWidget.setHorizontalHeaderLabels(self.column_titles)
-            
-            # Adicionar os tooltips em todas as colunas
-            for i in range(self.tableWidget.columnCount()):
-                header_item = self.tableWidget.horizontalHeaderItem(i)  # Obter o item do cabeçalho
-                header_item.setToolTip(self.column_tooltips[i])
+        group_stocks = self.groups_data[group_name]
 
-            self.tableWidget.setRowCount(len(group_stocks))
-            
-            for row, stock in enumerate(group_stocks):
-                stock_data = self.stocks_data.get(stock, {})
-                
-                value=str(stock)
-                for col, column in enumerate(self.column_keys):
-                    
-                    if column == "stock":
-                        item = QTableWidgetItem(stock)
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "average_price":
-                        value = stock_data.get('average_price', 0)
-                        item = NumericTableWidgetItem(f'{value:.2f}')
-                        
-                    elif column == "quantity":
-                        value = stock_data.get('quantity', 0)
-                        item = NumericTableWidgetItem(f'{value}')
-                        
-                    elif column == "total_amount":
-                        value = stock_data.get('total_amount', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "initial_amount":
-                        value = stock_data.get('initial_amount', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "capital_gain":
-                        value = stock_data.get('capital_gain', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "capital_gain_ratio":
-                        value = stock_data.get('capital_gain_ratio', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value*100.0:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "currentPrice":
-                        value = stock_data.get('currentPrice', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "longName":
-                        value = stock_data.get('longName', '') 
-                        item = QTableWidgetItem(f'{value}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-
-                    elif column == "daysData2y":
-                        prices = stock_data.get('daysData2y',[])
-                        color, percent = day_data_color_and_percent(prices)
-                        plot = plot_1d_simple_widget(prices, color=color)
-                        self.tableWidget.setCellWidget(row, col, plot)
-                        # ainda precisa de um item "vazio" para sorting funcionar
-                        item = QTableWidgetItem(f'{percent}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "daysData6mo":
-                        prices = stock_data.get('daysData6mo',[])
-                        color, percent = day_data_color_and_percent(prices)
-                        plot = plot_1d_simple_widget(prices, color=color)
-                        self.tableWidget.setCellWidget(row, col, plot)
-                        # ainda precisa de um item "vazio" para sorting funcionar
-                        item = QTableWidgetItem(f'{percent}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "daysData1mo":
-                        prices = stock_data.get('daysData1mo',[])
-                        color, percent = day_data_color_and_percent(prices)
-                        plot = plot_1d_simple_widget(prices, color=color)
-                        self.tableWidget.setCellWidget(row, col, plot)
-                        # ainda precisa de um item "vazio" para sorting funcionar
-                        item = QTableWidgetItem(f'{percent}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "dividendYield":
-                        value = stock_data.get('dividendYield', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value*1.0:.2f}') # factor
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "fiveYearAvgDividendYield":
-                        value = stock_data.get('fiveYearAvgDividendYield', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value:.2f}') # percentage no factor
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "forwardPE":
-                        value = stock_data.get('forwardPE', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "trailingEps":
-                        value = stock_data.get('trailingEps', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "pegRatio":
-                        value = stock_data.get('pegRatio', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "bookValue":
-                        value = stock_data.get('bookValue', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "priceToBook":
-                        value = stock_data.get('priceToBook', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "returnOnEquity":
-                        value = stock_data.get('returnOnEquity', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value*100.0:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "payoutRatio":
-                        value = stock_data.get('payoutRatio', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value*100.0:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "profitMargins":
-                        value = stock_data.get('profitMargins', float("nan")) 
-                        item = NumericTableWidgetItem(f'{value*100.0:.2f}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "sector":
-                        value = stock_data.get('sector', '') 
-                        item = QTableWidgetItem(f'{value}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    elif column == "industry":
-                        value = stock_data.get('industry', '') 
-                        item = QTableWidgetItem(f'{value}')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-                        
-                    else:
-                        item = QTableWidgetItem('')
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Torna a célula não editável
-
-                    # Define a cor de fundo para as células não editáveis
-                    if not (item.flags() & Qt.ItemIsEditable):
-                        item.setBackground(QColor('lightgray'))
-                    
-                    self.tableWidget.setItem(row, col, item)
-
-                # Atualizar o montante total do grupo
-                total_group_amount += stock_data.get('total_amount', 0)
-                total_group_gain   += stock_data.get('capital_gain', 0)
-
-            self.update_total_label(total_group_amount, total_group_gain)
-            
-            self.update_colors_in_table_items()
-
-        finally:
-            self.tableWidget.setSortingEnabled(True)
-            self.tableWidget.blockSignals(False)
+        self.table_model.set_stocks(self.stocks_data, group_stocks)
 
+        # reaplica a ordenação escolhida pelo usuário
+        if self.table_proxy.sortColumn() >= 0:
+            self.table_proxy.sort(self.table_proxy.sortColumn(), self.table_proxy.sortOrder())
 
-    def update_color_currentPrice(self, row):
-        price_current_item = self.tableWidget.item(row, self.column_keys.index('currentPrice'))  # Coluna 'Preço Atual'
-        price_mean_item    = self.tableWidget.item(row, self.column_keys.index('average_price'))  # Coluna 'Preço Médio'
-        
-        if price_current_item and price_mean_item:
-            # Atualiza a cor da célula com base no preço
-            price_mean   = float(price_mean_item.text())
-            currentPrice = float(price_current_item.text())
-            
-            if currentPrice > price_mean:
-                price_current_item.setBackground(QColor(CONFIG["green_color"])) # green
-            else:
-                price_current_item.setBackground(QColor(CONFIG["red_color"])) # red
-    
-    def update_color_generic(self,name,row):
-        item = self.tableWidget.item(row, self.column_keys.index(name)) 
+        self.recompute_current_group_total()
 
-        if item:
-            value  = float(item.text())
-    
-            if value>0:
-                item.setBackground(QColor(CONFIG["green_color"])) # green
-            else:
-                item.setBackground(QColor(CONFIG["red_color"])) # red
-    
-    def update_colors_in_table_items(self):
-        for row in range(self.tableWidget.rowCount()):
-            self.update_color_currentPrice( row)
-            self.update_color_generic("capital_gain_ratio",row)
-            self.update_color_generic("capital_gain",row)
-
-    def on_current_cell_changed(self, row, column, previous_row, previous_column):
-        if row < 0:
-            return
+        # durante uma atualização, o grupo exibido passa na frente
+        self.update_refresh_priorities()
 
-        id_stock = self.column_keys.index('stock')
-        stock_item = self.tableWidget.item(row, id_stock)
+    def update_table_row(self, stock):
+        """Redesenha só a linha do ticker (se estiver no grupo visível)."""
+        self.table_model.update_stock(stock)
 
-        if not stock_item:
+    def on_current_cell_changed(self, current, previous):
+        if not current.isValid():
             return
 
-        stock_name = stock_item.text()
+        stock_name = self.stock_at_view_row(current.row())
 
         # mostra gráfico 2y no painel inferior
         self.show_stock_plot_2y(stock_name, 
@@ -1194,25 +1215,16 @@ class StocksViewer(QMainWindow):
 
     def on_table_context_menu(self, pos):
         # índice lógico (row / column)
-        index = self.tableWidget.indexAt(pos)
+        index = self.tableView.indexAt(pos)
         if not index.isValid():
             return
 
-        row    = index.row()
-        column = index.column()
+        cell_text = index.data(Qt.DisplayRole) or ""
 
-        item = self.tableWidget.item(row, column)
-        if not item:
-            return
-
-        cell_text = item.text()
+        # nome do stock da linha
+        stock_name = self.stock_at_view_row(index.row())
 
-        # nome do stock (sempre da coluna 'stock')
-        id_stock   = self.column_keys.index('stock')
-        stock_item = self.tableWidget.item(row, id_stock)
-        stock_name = stock_item.text() if stock_item else ""
-
-        menu = QMenu(self.tableWidget)
+        menu = QMenu(self.tableView)
 
         # --- Copy ---
         action_copy = menu.addAction(CONFIG["copy_cell"])
@@ -1239,7 +1251,7 @@ class StocksViewer(QMainWindow):
             )
         
         # mostra o menu na posição correta
-        global_pos = self.tableWidget.viewport().mapToGlobal(pos)
+        global_pos = self.tableView.viewport().mapToGlobal(pos)
         menu.exec_(global_pos)
 
     def recompute_current_group_total(self):
@@ -1257,92 +1269,10 @@ class StocksViewer(QMainWindow):
 
         self.update_total_label(total_group_amount, total_group_gain)
 
-    def callback_item_changed(self, item):
-        # Proteção global
-        self.tableWidget.blockSignals(True)
-        self.tableWidget.setSortingEnabled(False)
-
-        try:
-            id_stock = self.column_keys.index('stock')
-            id_avr   = self.column_keys.index('average_price')
-            id_qtty  = self.column_keys.index('quantity')
-
-            col = item.column()
-            row = item.row()
-
-            # Só reage a quantity e average_price
-            if col not in (id_qtty, id_avr):
-                return
-
-            stock_item = self.tableWidget.item(row, id_stock)
-            if not stock_item:
-                return
-
-            stock_name = stock_item.text()
-
-            average_price_item = self.tableWidget.item(row, id_avr)
-            quantity_item      = self.tableWidget.item(row, id_qtty)
-
-            try:
-                average_price = float(average_price_item.text()) if average_price_item else 0.0
-            except ValueError:
-                average_price = 0.0
-
-            try:
-                quantity = int(quantity_item.text()) if quantity_item else 0
-            except ValueError:
-                quantity = 0
-
-            # --- Atualiza stocks_data ---
-            if col == id_avr:
-                self.stocks_data[stock_name]["average_price"] = average_price
-                self.update_color_currentPrice(row)
-
-            if col == id_qtty:
-                self.stocks_data[stock_name]["quantity"] = quantity
-
-            # --- Cálculos ---
-            initial_amount = quantity * average_price
-            total_amount   = quantity * self.stocks_data[stock_name]["currentPrice"]
-
-            self.stocks_data[stock_name]["total_amount"] = total_amount
-
-            # total_amount
-            col_total_amount = self.column_keys.index('total_amount')
-            item_total = self.tableWidget.item(row, col_total_amount)
-            if item_total:
-                item_total.setText(f"{total_amount:.2f}")
-
-            # initial_amount
-            col_initial_amount = self.column_keys.index('initial_amount')
-            item_initial = self.tableWidget.item(row, col_initial_amount)
-            if item_initial:
-                item_initial.setText(f"{initial_amount:.2f}")
-
-            # capital_gain
-            col_capital_gain = self.column_keys.index('capital_gain')
-            item_gain = self.tableWidget.item(row, col_capital_gain)
-            if item_gain:
-                gain = total_amount - initial_amount
-                item_gain.setText(f"{gain:.2f}")
-                self.update_color_generic("capital_gain", row)
-
-            # capital_gain_ratio
-            col_ratio = self.column_keys.index('capital_gain_ratio')
-            item_ratio = self.tableWidget.item(row, col_ratio)
-            if item_ratio:
-                ratio = 0.0
-                if initial_amount != 0:
-                    ratio = (total_amount - initial_amount) * 100.0 / initial_amount
-                item_ratio.setText(f"{ratio:.2f}")
-                self.update_color_generic("capital_gain_ratio", row)
-            
-            self.recompute_current_group_total()
-        
-        finally:
-            # 🔐 GARANTIA ABSOLUTA de restauração
-            self.tableWidget.setSortingEnabled(True)
-            self.tableWidget.blockSignals(False)
+    def on_stock_edited(self, stock_name):
+        """Quantidade ou preço médio editados: recalcula montantes e o total do grupo."""
+        self.stocks_data[stock_name] = update_amounts(self.stocks_data[stock_name])
+        self.recompute_current_group_total()
 
 
 